@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for Smart Village Management System
+Usage: gunicorn -c gunicorn.conf.py src.main:app
+"""
+
+import os
+
+# Bind to Railway's PORT (falls back to the local development port)
+bind = f"0.0.0.0:{os.environ.get('PORT', 5002)}"
+
+# gevent workers multiplex many keep-alive connections per process.
+# Route handlers must stay non-blocking: psycopg2 is made cooperative in
+# post_fork below, password hashing runs on gevent's native thread pool, and
+# anything slow (email, exports) belongs in a background job.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Keep client connections open between requests (HTTP/2 is terminated at the Railway edge)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Log to stdout/stderr for Railway
+accesslog = '-'
+errorlog = '-'
+
+def post_fork(server, worker):
+    # psycopg2 talks to libpq in C, which gevent's monkey patching cannot reach;
+    # without a wait callback every query would block the worker's event loop.
+    # This also covers the permission cache LISTEN connection.
+    if 'gevent' in server.cfg.worker_class_str:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,15 @@
+-- Database Migration: Indexes for property lookups
+-- Existing databases do not pick up model-level indexes from db.create_all()
+
+-- Foreign key indexes used by the "in use" COUNT checks before deleting a type/status
+CREATE INDEX IF NOT EXISTS ix_properties_property_type_id ON properties(property_type_id);
+CREATE INDEX IF NOT EXISTS ix_properties_property_status_id ON properties(property_status_id);
+
+-- Active, name-ordered lists of property types and statuses
+CREATE INDEX IF NOT EXISTS ix_pt_active_name ON property_types(is_active, name);
+CREATE INDEX IF NOT EXISTS ix_ps_active_name ON property_statuses(is_active, name);
+
+-- Filtered, newest-first property lists and keyset pages on (created_at, id)
+CREATE INDEX IF NOT EXISTS ix_property_status_created ON properties(property_status_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_property_type_created ON properties(property_type_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_property_created ON properties(created_at, id);
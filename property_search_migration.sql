@@ -0,0 +1,7 @@
+-- Database Migration: Trigram index for property address search
+-- Lets ILIKE '%term%' on properties.address use an index instead of a sequential scan
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_properties_address_trgm
+    ON properties USING gin (address gin_trgm_ops);
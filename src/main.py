@@ -1,40 +1,85 @@
+import hashlib
 import os
+import re
 import sys
+from functools import lru_cache
 from datetime import timedelta, datetime
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, Response, send_file, jsonify, request
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
+from werkzeug.security import safe_join
+from werkzeug.utils import import_string
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from src.models.user import db
-from src.models.user_model import User, Role, Permission
+from src.models.user_model import User, Role, Permission, role_permissions, DEFAULT_PASSWORD_HASH_METHOD
 from src.models.property_type_model import PropertyType
 from src.models.property_status_model import PropertyStatus
 from src.models.property_model import Property
-from src.routes.user import user_bp
-from src.routes.auth_routes import auth_bp
-from src.routes.admin_routes import admin_bp
-from src.routes.property_routes import property_bp
 
-# Import new models and routes
+# Import new models
 from src.models.village import Village
 from src.models.user_village import UserVillage
 from src.models.emergency_override import EmergencyOverride
-from src.routes.village_routes import village_bp
-from src.routes.user_village_routes import user_village_bp
-from src.routes.emergency_override_routes import emergency_bp
+from src.models.system_meta import SystemMeta
 from src.middleware.security_middleware import register_security_middleware
+from src.utils.json_provider import OrjsonProvider
+from src.utils.jwt_cache import CachingJWTManager
+from src.utils import permission_cache
+
+# Blueprints as (import path, url prefix); route modules are imported by create_app,
+# not when this module is imported. None keeps the blueprint's own url_prefix
+BLUEPRINTS = [
+    ('src.routes.user:user_bp', '/api'),
+    ('src.routes.auth_routes:auth_bp', '/api/auth'),
+    ('src.routes.admin_routes:admin_bp', '/api/admin'),
+    ('src.routes.property_routes:property_bp', '/api'),
+    ('src.routes.village_routes:village_bp', None),
+    ('src.routes.user_village_routes:user_village_bp', None),
+    ('src.routes.emergency_override_routes:emergency_bp', None)
+]
+
+# Paths resolved once at import
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_FOLDER = os.path.join(SRC_DIR, 'static')
+SQLITE_DATABASE_PATH = os.path.join(SRC_DIR, 'database', 'app.db')
+
+# Static assets are immutable per deploy, so file lookups and validators for serve()
+# are computed once per path and cached for the process lifetime
+@lru_cache(maxsize=4096)
+def _static_file(static_folder, path):
+    """(file path, content ETag, mtime) for a file inside static_folder, or None"""
+    file_path = safe_join(static_folder, path)
+    if file_path is None or not os.path.isfile(file_path):
+        return None
+    
+    with open(file_path, 'rb') as f:
+        etag = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=8)).hexdigest()
+    return file_path, etag, os.path.getmtime(file_path)
 
 def create_app():
-    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app = Flask(__name__, static_folder=STATIC_FOLDER)
+    app.json = OrjsonProvider(app)
     
     # Configuration
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'SmartVillage2025!SecretKey')
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'SmartVillage2025!JWTSecret')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
     app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+    # Set on scaled-out web workers when a single bootstrap process seeds the default data
+    app.config['SKIP_SEED'] = os.environ.get('SKIP_SEED', 'false').lower() == 'true'
+    # Disable where `flask --app src.main init-db` runs before deploy, so worker boots skip schema inspection
+    app.config['INIT_DB_ON_BOOT'] = os.environ.get('INIT_DB_ON_BOOT', 'true').lower() == 'true'
+    # Password hashing cost, e.g. "pbkdf2:sha256:<iterations>" or "scrypt:<n>:<r>:<p>"; logins
+    # re-hash passwords stored with any other method, so lowering or raising it takes effect gradually
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', DEFAULT_PASSWORD_HASH_METHOD)
+    # Listen for permission cache invalidations from other workers (postgresql+psycopg2 only; the
+    # listener starts with the first request, so CLI commands never run it)
+    app.config['PERMISSION_CACHE_LISTEN'] = os.environ.get('PERMISSION_CACHE_LISTEN', 'true').lower() == 'true'
     
     # Database configuration - Support both PostgreSQL and SQLite
     if os.environ.get('DATABASE_URL'):
@@ -46,14 +91,27 @@ def create_app():
         app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     else:
         # Development: Use SQLite
-        database_path = os.path.join(os.path.dirname(__file__), 'database', 'app.db')
-        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{database_path}"
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{SQLITE_DATABASE_PATH}"
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # PostgreSQL connection pool (per worker process): sized for concurrent requests,
+    # recycled before server-side idle timeouts and pinged so dead connections are replaced
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': 30,
+            'pool_recycle': 1800,
+            'pool_pre_ping': True
+        }
+    
     # Initialize extensions
     db.init_app(app)
-    jwt = JWTManager(app)
+    jwt = CachingJWTManager(app)
+    
+    if app.config['PERMISSION_CACHE_LISTEN']:
+        permission_cache.start_listener(app)
     
     # Enable CORS for all routes including Railway domains and Manus deployment
     cors_origins = [
@@ -99,6 +157,15 @@ def create_app():
         'https://aapmekpr.manus.space/'
     ]
     
+    # One anchored, case-insensitive regex for every allowed origin so each CORS check is a
+    # single match; '*' stands for one subdomain label and trailing slashes are ignored
+    cors_origin_pattern = re.compile(
+        '(?:' + '|'.join(sorted({
+            re.escape(origin.rstrip('/')).replace(r'\*', '[^./]+') for origin in cors_origins
+        })) + r')\Z',
+        re.IGNORECASE
+    )
+    
     # CORS Debugging: Log all CORS-related information
     @app.before_request
     def log_cors_info():
@@ -110,11 +177,7 @@ def create_app():
             app.logger.info(f"🌐 CORS Request - Origin: {origin}, Method: {method}, Path: {path}")
             
             # Check if origin is in allowed list
-            origin_allowed = False
-            for allowed_origin in cors_origins:
-                if allowed_origin == origin or (allowed_origin.endswith('*') and origin.startswith(allowed_origin[:-1])):
-                    origin_allowed = True
-                    break
+            origin_allowed = cors_origin_pattern.match(origin) is not None
             
             app.logger.info(f"🔍 CORS Check - Origin '{origin}' allowed: {origin_allowed}")
             
@@ -134,30 +197,43 @@ def create_app():
             
         return response
     
-    CORS(app, origins=cors_origins, supports_credentials=True)
-    
-    # Register existing blueprints
-    app.register_blueprint(user_bp, url_prefix='/api')
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    app.register_blueprint(property_bp, url_prefix='/api')
+    CORS(app, origins=cors_origin_pattern, supports_credentials=True)
     
-    # Register new blueprints
-    app.register_blueprint(village_bp)
-    app.register_blueprint(user_village_bp)
-    app.register_blueprint(emergency_bp)
+    # Register blueprints
+    for import_path, url_prefix in BLUEPRINTS:
+        if url_prefix is None:
+            app.register_blueprint(import_string(import_path))
+        else:
+            app.register_blueprint(import_string(import_path), url_prefix=url_prefix)
     
     # Register security middleware
     register_security_middleware(app)
     
+    # Static bodies for the liveness probe and /api/info, serialized once per app
+    health_body = app.json.dumpb({
+        'status': 'healthy',
+        'service': 'Smart Village API',
+        'version': '1.0.0'
+    })
+    api_info_body = app.json.dumpb({
+        'name': 'Smart Village Management API',
+        'version': '1.0.0',
+        'description': 'API for Smart Village Management System',
+        'endpoints': {
+            'auth': '/api/auth',
+            'users': '/api/users',
+            'admin': '/api/admin',
+            'properties': '/api/properties',
+            'villages': '/api/villages',
+            'emergency_override': '/api/emergency-override',
+            'health': '/health'
+        }
+    })
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
-        return jsonify({
-            'status': 'healthy',
-            'service': 'Smart Village API',
-            'version': '1.0.0'
-        })
+        return Response(health_body, mimetype='application/json')
     
     # API health check endpoint
     @app.route('/api/health')
@@ -172,160 +248,185 @@ def create_app():
     # API info endpoint
     @app.route('/api/info')
     def api_info():
-        return jsonify({
-            'name': 'Smart Village Management API',
-            'version': '1.0.0',
-            'description': 'API for Smart Village Management System',
-            'endpoints': {
-                'auth': '/api/auth',
-                'users': '/api/users',
-                'admin': '/api/admin',
-                'properties': '/api/properties',
-                'villages': '/api/villages',
-                'emergency_override': '/api/emergency-override',
-                'health': '/health'
-            }
-        })
+        return Response(api_info_body, mimetype='application/json')
+    
+    # JWT error handlers; the bodies never vary, so they are serialized once
+    expired_token_body = app.json.dumpb({'message': 'Token has expired'})
+    invalid_token_body = app.json.dumpb({'message': 'Invalid token'})
+    missing_token_body = app.json.dumpb({'message': 'Authorization token is required'})
     
-    # JWT error handlers
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
-        return jsonify({'message': 'Token has expired'}), 401
+        return Response(expired_token_body, status=401, mimetype='application/json')
     
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
-        return jsonify({'message': 'Invalid token'}), 401
+        return Response(invalid_token_body, status=401, mimetype='application/json')
     
     @jwt.unauthorized_loader
     def missing_token_callback(error):
-        return jsonify({'message': 'Authorization token is required'}), 401
+        return Response(missing_token_body, status=401, mimetype='application/json')
     
     # Create database tables and default data
-    with app.app_context():
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing database tables and seed the default data"""
         db.create_all()
         create_default_data()
     
+    if app.config['INIT_DB_ON_BOOT']:
+        with app.app_context():
+            db.create_all()
+            if not app.config['SKIP_SEED']:
+                create_default_data()
+    
     # Serve frontend files
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
-            # Return API info instead of 404 when no static folder
+        static_file = _static_file(STATIC_FOLDER, path) if path != "" else None
+        if static_file is None:
+            static_file = _static_file(STATIC_FOLDER, 'index.html')
+        
+        if static_file:
+            # Conditional requests matching the precomputed ETag get a bodiless 304
+            file_path, etag, last_modified = static_file
+            return send_file(file_path, etag=etag, last_modified=last_modified, conditional=True)
+        else:
+            # Return API info instead of 404 when index.html not found
             return jsonify({
                 'name': 'Smart Village Management API',
                 'version': '1.0.0',
                 'status': 'running',
-                'endpoints': {
-                    'auth': '/api/auth',
-                    'users': '/api/users',
-                    'admin': '/api/admin',
-                    'properties': '/api/properties',
-                    'villages': '/api/villages',
-                    'emergency_override': '/api/emergency-override',
-                    'health': '/api/health'
-                }
+                'message': 'Frontend not available, API endpoints accessible'
             })
-
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                # Return API info instead of 404 when index.html not found
-                return jsonify({
-                    'name': 'Smart Village Management API',
-                    'version': '1.0.0',
-                    'status': 'running',
-                    'message': 'Frontend not available, API endpoints accessible'
-                })
     
     return app
 
+# Recorded in system_meta once seeding succeeds; later boots skip create_default_data.
+# Bump it whenever the seed data below changes so existing databases are re-seeded
+SEED_VERSION = '1'
+SEED_VERSION_KEY = 'seed_version'
+
+# PostgreSQL advisory lock id serializing seeding across concurrently booting workers
+SEED_LOCK_ID = 7281450
+
+def insert_ignoring_conflicts(table, index_elements):
+    """INSERT ... ON CONFLICT DO NOTHING for the configured database (PostgreSQL or SQLite)"""
+    insert = postgresql_insert if db.engine.dialect.name == 'postgresql' else sqlite_insert
+    return insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+# Default seed data, built once at import; create_default_data turns it into insert rows.
+# Permissions are (name, resource, action, description)
+DEFAULT_PERMISSIONS = (
+    ('user.create', 'users', 'create', 'Create new users'),
+    ('user.read', 'users', 'read', 'View user information'),
+    ('user.update', 'users', 'update', 'Update user information'),
+    ('user.delete', 'users', 'delete', 'Delete users'),
+    ('property.create', 'properties', 'create', 'Create new properties'),
+    ('property.read', 'properties', 'read', 'View property information'),
+    ('property.update', 'properties', 'update', 'Update property information'),
+    ('property.delete', 'properties', 'delete', 'Delete properties'),
+    ('admin.property_types', 'admin', 'property_types', 'Manage property types'),
+    ('admin.property_statuses', 'admin', 'property_statuses', 'Manage property statuses'),
+    ('finance.create', 'finance', 'create', 'Create financial records'),
+    ('finance.read', 'finance', 'read', 'View financial information'),
+    ('finance.update', 'finance', 'update', 'Update financial records'),
+    ('finance.delete', 'finance', 'delete', 'Delete financial records'),
+    ('report.read', 'reports', 'read', 'View reports'),
+    ('report.create', 'reports', 'create', 'Generate reports'),
+    ('system.admin', 'system', 'admin', 'System administration access'),
+    
+    # Village and role management permissions
+    ('villages.create', 'villages', 'create', 'Create new villages'),
+    ('villages.read', 'villages', 'read', 'View village information'),
+    ('villages.update', 'villages', 'update', 'Update village information'),
+    ('villages.delete', 'villages', 'delete', 'Delete villages'),
+    ('users.assign_village', 'users', 'assign_village', 'Assign villages to users'),
+    ('users.assign_role', 'users', 'assign_role', 'Assign roles to users'),
+    ('audit.emergency_override', 'audit', 'emergency_override', 'Create emergency overrides'),
+    ('audit.read', 'audit', 'read', 'View audit logs'),
+    ('system.maintenance', 'system', 'maintenance', 'Perform system maintenance')
+)
+ALL_PERMISSION_NAMES = frozenset(permission[0] for permission in DEFAULT_PERMISSIONS)
+
+# Roles are (name, description, permission names)
+DEFAULT_ROLES = (
+    ('superadmin', 'Super Administrator with full access', ALL_PERMISSION_NAMES),
+    ('village_admin', 'Village Administrator with village-scoped access', frozenset({
+        'villages.read', 'villages.update',
+        'user.read', 'user.update',
+        'property.create', 'property.read', 'property.update', 'property.delete',
+        'finance.create', 'finance.read', 'finance.update',
+        'report.read', 'report.create'
+    })),
+    ('village_user', 'Village User with read-only access', frozenset({'property.read', 'finance.read', 'report.read'}))
+)
+
+# Property types are (name, description); statuses are (name, color, description)
+DEFAULT_PROPERTY_TYPES = (
+    ('House', 'Single family house'),
+    ('Apartment', 'Apartment unit'),
+    ('Townhouse', 'Townhouse or row house'),
+    ('Commercial', 'Commercial property')
+)
+DEFAULT_PROPERTY_STATUSES = (
+    ('Available', '#3B82F6', 'Property is available'),
+    ('Occupied', '#6B7280', 'Property is currently occupied'),
+    ('Maintenance', '#F59E0B', 'Property is under maintenance')
+)
+
+# Hash of the default superadmin password 'admin123', precomputed so seeding a fresh
+# database skips the deliberately slow key derivation; override per deployment
+SUPERADMIN_PASSWORD_HASH = os.environ.get(
+    'SUPERADMIN_PASSWORD_HASH',
+    'pbkdf2:sha256:600000$TtIiObMmJ17IJiNz$fc31d82af6c15d6a9e93713e33b09b6a71621ffb4818f07c1ccc06ea94f6b86c'
+)
+
 def create_default_data():
     """Create default roles, permissions, superadmin user, and property data"""
     try:
-        # Create default permissions with resource and action
-        permissions_data = [
-            {'name': 'user.create', 'resource': 'users', 'action': 'create', 'description': 'Create new users'},
-            {'name': 'user.read', 'resource': 'users', 'action': 'read', 'description': 'View user information'},
-            {'name': 'user.update', 'resource': 'users', 'action': 'update', 'description': 'Update user information'},
-            {'name': 'user.delete', 'resource': 'users', 'action': 'delete', 'description': 'Delete users'},
-            {'name': 'property.create', 'resource': 'properties', 'action': 'create', 'description': 'Create new properties'},
-            {'name': 'property.read', 'resource': 'properties', 'action': 'read', 'description': 'View property information'},
-            {'name': 'property.update', 'resource': 'properties', 'action': 'update', 'description': 'Update property information'},
-            {'name': 'property.delete', 'resource': 'properties', 'action': 'delete', 'description': 'Delete properties'},
-            {'name': 'admin.property_types', 'resource': 'admin', 'action': 'property_types', 'description': 'Manage property types'},
-            {'name': 'admin.property_statuses', 'resource': 'admin', 'action': 'property_statuses', 'description': 'Manage property statuses'},
-            {'name': 'finance.create', 'resource': 'finance', 'action': 'create', 'description': 'Create financial records'},
-            {'name': 'finance.read', 'resource': 'finance', 'action': 'read', 'description': 'View financial information'},
-            {'name': 'finance.update', 'resource': 'finance', 'action': 'update', 'description': 'Update financial records'},
-            {'name': 'finance.delete', 'resource': 'finance', 'action': 'delete', 'description': 'Delete financial records'},
-            {'name': 'report.read', 'resource': 'reports', 'action': 'read', 'description': 'View reports'},
-            {'name': 'report.create', 'resource': 'reports', 'action': 'create', 'description': 'Generate reports'},
-            {'name': 'system.admin', 'resource': 'system', 'action': 'admin', 'description': 'System administration access'},
-            
-            # New village and role management permissions
-            {'name': 'villages.create', 'resource': 'villages', 'action': 'create', 'description': 'Create new villages'},
-            {'name': 'villages.read', 'resource': 'villages', 'action': 'read', 'description': 'View village information'},
-            {'name': 'villages.update', 'resource': 'villages', 'action': 'update', 'description': 'Update village information'},
-            {'name': 'villages.delete', 'resource': 'villages', 'action': 'delete', 'description': 'Delete villages'},
-            {'name': 'users.assign_village', 'resource': 'users', 'action': 'assign_village', 'description': 'Assign villages to users'},
-            {'name': 'users.assign_role', 'resource': 'users', 'action': 'assign_role', 'description': 'Assign roles to users'},
-            {'name': 'audit.emergency_override', 'resource': 'audit', 'action': 'emergency_override', 'description': 'Create emergency overrides'},
-            {'name': 'audit.read', 'resource': 'audit', 'action': 'read', 'description': 'View audit logs'},
-            {'name': 'system.maintenance', 'resource': 'system', 'action': 'maintenance', 'description': 'Perform system maintenance'}
-        ]
+        if SystemMeta.get_value(SEED_VERSION_KEY) == SEED_VERSION:
+            return
         
-        for perm_data in permissions_data:
-            if not Permission.query.filter_by(name=perm_data['name']).first():
-                permission = Permission(
-                    name=perm_data['name'], 
-                    resource=perm_data['resource'],
-                    action=perm_data['action'],
-                    description=perm_data['description']
-                )
-                db.session.add(permission)
+        # Wait for any worker already seeding, then re-check what it committed
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(text('SELECT pg_advisory_xact_lock(:lock_id)'), {'lock_id': SEED_LOCK_ID})
+            if SystemMeta.get_value(SEED_VERSION_KEY) == SEED_VERSION:
+                db.session.rollback()
+                return
+        
+        # Create default permissions; seed rows are inserted in one statement per table
+        # and existing names are left untouched
+        db.session.execute(
+            insert_ignoring_conflicts(Permission.__table__, ['name']).values([
+                {'name': name, 'resource': resource, 'action': action, 'description': description}
+                for name, resource, action, description in DEFAULT_PERMISSIONS
+            ])
+        )
         
-        # Create default roles
-        roles_data = [
-            {
-                'name': 'superadmin',
-                'description': 'Super Administrator with full access',
-                'permissions': [p['name'] for p in permissions_data]
-            },
-            {
-                'name': 'village_admin',
-                'description': 'Village Administrator with village-scoped access',
-                'permissions': [
-                    'villages.read', 'villages.update',
-                    'user.read', 'user.update',
-                    'property.create', 'property.read', 'property.update', 'property.delete',
-                    'finance.create', 'finance.read', 'finance.update',
-                    'report.read', 'report.create'
-                ]
-            },
-            {
-                'name': 'village_user',
-                'description': 'Village User with read-only access',
-                'permissions': ['property.read', 'finance.read', 'report.read']
-            }
-        ]
+        # Create default roles; RETURNING yields only the roles inserted now,
+        # so existing roles keep their permissions
+        new_role_ids = dict(db.session.execute(
+            insert_ignoring_conflicts(Role.__table__, ['name'])
+            .values([{'name': name, 'description': description} for name, description, _ in DEFAULT_ROLES])
+            .returning(Role.name, Role.id)
+        ).all())
         
-        for role_data in roles_data:
-            if not Role.query.filter_by(name=role_data['name']).first():
-                role = Role(name=role_data['name'], description=role_data['description'])
-                
-                # Add role to session first to avoid autoflush conflicts
-                db.session.add(role)
-                
-                # Add permissions to role
-                for perm_name in role_data['permissions']:
-                    permission = Permission.query.filter_by(name=perm_name).first()
-                    if permission:
-                        role.permissions.append(permission)
+        if new_role_ids:
+            permission_ids = dict(db.session.execute(
+                select(Permission.name, Permission.id).where(Permission.name.in_(ALL_PERMISSION_NAMES))
+            ).all())
+            
+            role_permission_rows = [
+                {'role_id': new_role_ids[name], 'permission_id': permission_ids[perm_name]}
+                for name, _, perm_names in DEFAULT_ROLES if name in new_role_ids
+                for perm_name in perm_names if perm_name in permission_ids
+            ]
+            db.session.execute(
+                insert_ignoring_conflicts(role_permissions, ['role_id', 'permission_id']),
+                role_permission_rows
+            )
         
         # Create superadmin user
         if not User.query.filter_by(username='superadmin').first():
@@ -338,7 +439,7 @@ def create_default_data():
                 is_active=True,
                 is_verified=True
             )
-            superadmin.set_password('admin123')
+            superadmin.set_password_hash(SUPERADMIN_PASSWORD_HASH)
             
             if superadmin_role:
                 superadmin.roles.append(superadmin_role)
@@ -346,69 +447,49 @@ def create_default_data():
             db.session.add(superadmin)
         
         # Create default property types
-        property_types_data = [
-            {'name': 'House', 'description': 'Single family house'},
-            {'name': 'Apartment', 'description': 'Apartment unit'},
-            {'name': 'Townhouse', 'description': 'Townhouse or row house'},
-            {'name': 'Commercial', 'description': 'Commercial property'}
-        ]
-        
-        for type_data in property_types_data:
-            if not PropertyType.query.filter_by(name=type_data['name']).first():
-                property_type = PropertyType(
-                    name=type_data['name'],
-                    description=type_data['description']
-                )
-                db.session.add(property_type)
+        db.session.execute(
+            insert_ignoring_conflicts(PropertyType.__table__, ['name']).values([
+                {'name': name, 'description': description}
+                for name, description in DEFAULT_PROPERTY_TYPES
+            ])
+        )
         
         # Create default property statuses
-        property_statuses_data = [
-            {'name': 'Available', 'color': '#3B82F6', 'description': 'Property is available'},
-            {'name': 'Occupied', 'color': '#6B7280', 'description': 'Property is currently occupied'},
-            {'name': 'Maintenance', 'color': '#F59E0B', 'description': 'Property is under maintenance'}
-        ]
-        
-        for status_data in property_statuses_data:
-            if not PropertyStatus.query.filter_by(name=status_data['name']).first():
-                property_status = PropertyStatus(
-                    name=status_data['color'],
-                    color=status_data['color'],
-                    description=status_data['description']
-                )
-                db.session.add(property_status)
-        
-        # Commit all changes
-        db.session.commit()
+        db.session.execute(
+            insert_ignoring_conflicts(PropertyStatus.__table__, ['name']).values([
+                {'name': name, 'color': color, 'description': description}
+                for name, color, description in DEFAULT_PROPERTY_STATUSES
+            ])
+        )
         
         # Create sample properties
         if Property.query.count() == 0:
-            house_type = PropertyType.query.filter_by(name='House').first()
-            apartment_type = PropertyType.query.filter_by(name='Apartment').first()
-            townhouse_type = PropertyType.query.filter_by(name='Townhouse').first()
-            
-            available_status = PropertyStatus.query.filter_by(name='Available').first()
-            occupied_status = PropertyStatus.query.filter_by(name='Occupied').first()
-            maintenance_status = PropertyStatus.query.filter_by(name='Maintenance').first()
+            type_ids = dict(db.session.execute(select(PropertyType.name, PropertyType.id)).all())
+            status_ids = dict(db.session.execute(select(PropertyStatus.name, PropertyStatus.id)).all())
             
             sample_properties = [
-                {'address': '123 Main Street, Smart Village', 'type': house_type, 'status': available_status, 'bedrooms': 3, 'bathrooms': 2},
-                {'address': '456 Oak Avenue, Smart Village', 'type': apartment_type, 'status': occupied_status, 'bedrooms': 2, 'bathrooms': 1},
-                {'address': '789 Pine Road, Smart Village', 'type': townhouse_type, 'status': occupied_status, 'bedrooms': 4, 'bathrooms': 3},
-                {'address': '321 Elm Street, Smart Village', 'type': house_type, 'status': maintenance_status, 'bedrooms': 2, 'bathrooms': 1},
-                {'address': '654 Maple Drive, Smart Village', 'type': apartment_type, 'status': available_status, 'bedrooms': 1, 'bathrooms': 1},
+                {'address': '123 Main Street, Smart Village', 'type': 'House', 'status': 'Available', 'bedrooms': 3, 'bathrooms': 2},
+                {'address': '456 Oak Avenue, Smart Village', 'type': 'Apartment', 'status': 'Occupied', 'bedrooms': 2, 'bathrooms': 1},
+                {'address': '789 Pine Road, Smart Village', 'type': 'Townhouse', 'status': 'Occupied', 'bedrooms': 4, 'bathrooms': 3},
+                {'address': '321 Elm Street, Smart Village', 'type': 'House', 'status': 'Maintenance', 'bedrooms': 2, 'bathrooms': 1},
+                {'address': '654 Maple Drive, Smart Village', 'type': 'Apartment', 'status': 'Available', 'bedrooms': 1, 'bathrooms': 1},
             ]
             
-            for prop_data in sample_properties:
-                if prop_data['type'] and prop_data['status']:
-                    property_obj = Property(
-                        address=prop_data['address'],
-                        property_type_id=prop_data['type'].id,
-                        property_status_id=prop_data['status'].id,
-                        bedrooms=prop_data['bedrooms'],
-                        bathrooms=prop_data['bathrooms'],
-                        description=f"Sample {prop_data['type'].name.lower()} property"
-                    )
-                    db.session.add(property_obj)
+            # Plain row dicts in one bulk INSERT, without building ORM instances
+            property_rows = [
+                {
+                    'address': prop_data['address'],
+                    'property_type_id': type_ids[prop_data['type']],
+                    'property_status_id': status_ids[prop_data['status']],
+                    'bedrooms': prop_data['bedrooms'],
+                    'bathrooms': prop_data['bathrooms'],
+                    'description': f"Sample {prop_data['type'].lower()} property"
+                }
+                for prop_data in sample_properties
+                if prop_data['type'] in type_ids and prop_data['status'] in status_ids
+            ]
+            if property_rows:
+                db.session.execute(db.insert(Property), property_rows)
         
         # Create default villages to match PostgreSQL data
         if Village.query.count() == 0:
@@ -450,6 +531,8 @@ def create_default_data():
                 )
                 db.session.add(village)
         
+        # Everything is committed at once so the advisory lock covers the whole seed
+        SystemMeta.set_value(SEED_VERSION_KEY, SEED_VERSION)
         db.session.commit()
         print("✅ Default data created successfully")
         
@@ -5,16 +5,48 @@ Handles permission checking, village scope validation, and emergency overrides
 
 from functools import wraps
 from flask import request, jsonify, current_app, g
+from src.models.user import db
 from src.models.user_model import User
 from src.models.user_village import UserVillage
 from src.models.emergency_override import EmergencyOverride
 from src.routes.auth_routes import get_current_user
+from src.utils import permission_cache
+import logging
+import math
+import queue
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 # Rate limiting storage (in production, use Redis)
-rate_limit_storage = defaultdict(list)
+# Sharded by hash(client_id); each shard maps client_id -> (tokens, last_refill),
+# least recently used first, and has its own lock so refill+check+consume is atomic
+RATE_LIMIT_SHARDS = 32
+RATE_LIMIT_MAX_CLIENTS = 100000
+_rate_limit_shards = [OrderedDict() for _ in range(RATE_LIMIT_SHARDS)]
+_rate_limit_locks = [threading.Lock() for _ in range(RATE_LIMIT_SHARDS)]
+
+def _rate_limit_shard(client_id):
+    """Return the (storage, lock) shard for a client"""
+    i = hash(client_id) & (RATE_LIMIT_SHARDS - 1)
+    return _rate_limit_shards[i], _rate_limit_locks[i]
+
+# Emergency override cleanup schedule (seconds, time.monotonic based)
+OVERRIDE_CLEANUP_INTERVAL = 300
+_next_override_cleanup = 0.0
+
+def _is_superadmin(current_user):
+    """Resolve the Super Admin check once per request and keep it on g"""
+    if '_is_superadmin' not in g:
+        g._is_superadmin = current_user.has_role('superadmin')
+    return g._is_superadmin
+
+def _json_body():
+    """JSON request body as a dict; no parse attempt for non-JSON requests (e.g. GET)"""
+    if not request.is_json:
+        return {}
+    return request.get_json(silent=True) or {}
 
 def rate_limit(max_requests=100, window_minutes=15):
     """Rate limiting decorator"""
@@ -27,24 +59,35 @@ def rate_limit(max_requests=100, window_minutes=15):
             if current_user:
                 client_id = f"user_{current_user.id}"
             
-            # Clean old entries
-            cutoff_time = time.time() - (window_minutes * 60)
-            rate_limit_storage[client_id] = [
-                timestamp for timestamp in rate_limit_storage[client_id]
-                if timestamp > cutoff_time
-            ]
+            storage, lock = _rate_limit_shard(client_id)
+            retry_after = None
+            with lock:
+                # Refill the token bucket for the time elapsed since the last request
+                now = time.monotonic()
+                tokens, last_refill = storage.get(client_id, (max_requests, now))
+                refill_rate = max_requests / (window_minutes * 60)
+                tokens = min(max_requests, tokens + (now - last_refill) * refill_rate)
+                
+                # Consume a token for the current request if one is available
+                if tokens < 1:
+                    retry_after = math.ceil((1 - tokens) / refill_rate)
+                else:
+                    tokens -= 1
+                storage[client_id] = (tokens, now)
+                storage.move_to_end(client_id)
+                
+                # Evict the least recently seen client once the shard is full
+                if len(storage) > RATE_LIMIT_MAX_CLIENTS // RATE_LIMIT_SHARDS:
+                    storage.popitem(last=False)
             
             # Check rate limit
-            if len(rate_limit_storage[client_id]) >= max_requests:
+            if retry_after is not None:
                 return jsonify({
                     'error': 'Rate limit exceeded',
                     'code': 'RATE_LIMIT_EXCEEDED',
-                    'retry_after': window_minutes * 60
+                    'retry_after': retry_after
                 }), 429
             
-            # Add current request
-            rate_limit_storage[client_id].append(time.time())
-            
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -53,6 +96,9 @@ def require_village_scope(permission, allow_emergency_override=True):
     """
     Enhanced permission decorator with village scope and emergency override support
     """
+    # Split once at decoration time, e.g. 'villages.read' -> ('villages', 'read')
+    resource, _, action = permission.partition('.')
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -62,14 +108,14 @@ def require_village_scope(permission, allow_emergency_override=True):
             
             # Get village_id from various sources
             village_id = (
-                kwargs.get('village_id') or 
+                kwargs.get('village_id') or
                 request.view_args.get('village_id') or
-                request.json.get('village_id') if request.json else None or
+                _json_body().get('village_id') or
                 request.args.get('village_id')
             )
             
             # Super Admin bypasses all checks (except emergency override logging)
-            if current_user.has_role('superadmin'):
+            if _is_superadmin(current_user):
                 # Log Super Admin access for audit
                 if village_id:
                     current_app.logger.info(
@@ -79,12 +125,9 @@ def require_village_scope(permission, allow_emergency_override=True):
                 return f(*args, **kwargs)
             
             # Check basic permission
-            if not current_user.has_permission(permission):
+            if not permission_cache.check(current_user, permission):
                 # Check for emergency override if allowed
                 if allow_emergency_override and village_id:
-                    resource = permission.split('.')[0]  # e.g., 'villages' from 'villages.read'
-                    action = permission.split('.')[1]    # e.g., 'read' from 'villages.read'
-                    
                     override = EmergencyOverride.check_override(
                         user_id=current_user.id,
                         resource=resource,
@@ -109,12 +152,9 @@ def require_village_scope(permission, allow_emergency_override=True):
                 }), 403
             
             # Check village scope for non-super admins
-            if village_id and not current_user.has_village_access(village_id):
+            if village_id and not permission_cache.check(current_user, village_id=village_id):
                 # Check for emergency override
                 if allow_emergency_override:
-                    resource = permission.split('.')[0]
-                    action = permission.split('.')[1]
-                    
                     override = EmergencyOverride.check_override(
                         user_id=current_user.id,
                         resource=resource,
@@ -146,6 +186,9 @@ def require_resource_permission(resource, action, allow_emergency_override=True)
     """
     Generic resource permission decorator with emergency override support
     """
+    permission = f"{resource}.{action}"
+    resource_id_key = f"{resource}_id"
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -153,24 +196,22 @@ def require_resource_permission(resource, action, allow_emergency_override=True)
             if not current_user:
                 return jsonify({'error': 'Authentication required'}), 401
             
-            permission = f"{resource}.{action}"
-            
-            # Get target_id from various sources
-            target_id = (
-                kwargs.get('id') or
-                kwargs.get(f'{resource}_id') or
-                request.view_args.get('id') or
-                request.view_args.get(f'{resource}_id') or
-                request.json.get('id') if request.json else None or
-                request.args.get('id')
-            )
-            
-            # Super Admin bypasses permission checks
-            if current_user.has_role('superadmin'):
+            # Super Admin bypasses permission checks before anything else is resolved
+            if _is_superadmin(current_user):
                 return f(*args, **kwargs)
             
             # Check basic permission
-            if not current_user.has_permission(permission):
+            if not permission_cache.check(current_user, permission):
+                # Get target_id from various sources (only needed for overrides)
+                target_id = (
+                    kwargs.get('id') or
+                    kwargs.get(resource_id_key) or
+                    request.view_args.get('id') or
+                    request.view_args.get(resource_id_key) or
+                    _json_body().get('id') or
+                    request.args.get('id')
+                )
+                
                 # Check for emergency override if allowed
                 if allow_emergency_override and target_id:
                     override = EmergencyOverride.check_override(
@@ -199,6 +240,46 @@ def require_resource_permission(resource, action, allow_emergency_override=True)
         return decorated_function
     return decorator
 
+AUDIT_LOG_FORMAT = "AUDIT: %s by %s on %s %s - %s (%s) in %.2fms"
+
+# Audit records are written by a background thread so logging I/O stays off the request path
+AUDIT_QUEUE_SIZE = 10000
+_audit_queue = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+_audit_thread = None
+_audit_thread_lock = threading.Lock()
+# Records dropped on a full queue since the audit thread last reported them
+_audit_dropped = 0
+_audit_dropped_lock = threading.Lock()
+
+def _drain_audit_queue():
+    """Write queued audit records (runs in the audit thread)"""
+    global _audit_dropped
+    while True:
+        logger, level, message, args, audit_entry = _audit_queue.get()
+        # The structured entry rides on the record (record.audit) for handlers that ship audit data
+        logger.log(level, message, *args, extra={'audit': audit_entry})
+        
+        if _audit_dropped:
+            with _audit_dropped_lock:
+                dropped, _audit_dropped = _audit_dropped, 0
+            logger.warning("AUDIT: %d records dropped (audit queue full)", dropped)
+
+def _enqueue_audit(logger, level, message, args, audit_entry):
+    """Queue an audit record, starting the audit thread on first use (after worker fork)"""
+    global _audit_thread, _audit_dropped
+    if _audit_thread is None:
+        with _audit_thread_lock:
+            if _audit_thread is None:
+                _audit_thread = threading.Thread(target=_drain_audit_queue, name='audit-log', daemon=True)
+                _audit_thread.start()
+    
+    try:
+        _audit_queue.put_nowait((logger, level, message, args, audit_entry))
+    except queue.Full:
+        # Drop rather than block the request; the audit thread reports the count
+        with _audit_dropped_lock:
+            _audit_dropped += 1
+
 def audit_log(action_type, resource=None, target_id=None, details=None):
     """
     Audit logging decorator
@@ -231,60 +312,62 @@ def audit_log(action_type, resource=None, target_id=None, details=None):
                 # Log the action
                 duration = time.time() - start_time
                 
-                # Get client info
-                client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-                user_agent = request.headers.get('User-Agent', '')
-                
-                # Determine resource and target_id if not provided
-                if not resource:
-                    resource = request.endpoint.split('.')[-1] if request.endpoint else 'unknown'
-                
-                if not target_id:
-                    target_id = (
-                        kwargs.get('id') or
-                        request.view_args.get('id') if request.view_args else None
-                    )
-                
                 # Check if emergency override was used
                 emergency_override_id = None
-                if hasattr(g, 'emergency_override_used'):
-                    emergency_override_id = str(g.emergency_override_used.id)
+                override = g.get('emergency_override_used')
+                if override:
+                    emergency_override_id = str(override.id)
                 
-                # Create audit log entry
-                audit_entry = {
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'user_id': str(current_user.id) if current_user else None,
-                    'username': current_user.username if current_user else None,
-                    'action_type': action_type,
-                    'resource': resource,
-                    'target_id': str(target_id) if target_id else None,
-                    'status': status,
-                    'status_code': status_code,
-                    'duration_ms': round(duration * 1000, 2),
-                    'client_ip': client_ip,
-                    'user_agent': user_agent,
-                    'emergency_override_id': emergency_override_id,
-                    'details': details
-                }
-                
-                # Log to application logger
-                log_level = 'WARNING' if emergency_override_id else 'INFO'
-                log_message = (
-                    f"AUDIT: {action_type} by {current_user.username if current_user else 'Anonymous'} "
-                    f"on {resource} {target_id or ''} - {status} ({status_code}) "
-                    f"in {duration*1000:.2f}ms"
-                )
-                
-                if emergency_override_id:
-                    log_message += f" [EMERGENCY OVERRIDE: {emergency_override_id}]"
-                
-                if log_level == 'WARNING':
-                    current_app.logger.warning(log_message)
-                else:
-                    current_app.logger.info(log_message)
-                
-                # In production, this would also be sent to a dedicated audit log system
-                # audit_logger.log(audit_entry)
+                # Skip building the entry when nothing would be emitted
+                logger = current_app.logger
+                if emergency_override_id or logger.isEnabledFor(logging.INFO):
+                    # Get client info
+                    client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
+                    user_agent = request.headers.get('User-Agent', '')
+                    
+                    # Determine resource and target_id if not provided
+                    audit_resource = resource
+                    if not audit_resource:
+                        audit_resource = request.endpoint.split('.')[-1] if request.endpoint else 'unknown'
+                    
+                    audit_target_id = target_id
+                    if not audit_target_id:
+                        audit_target_id = (
+                            kwargs.get('id') or
+                            (request.view_args or {}).get('id')
+                        )
+                    
+                    username = current_user.username if current_user else None
+                    
+                    # Create audit log entry
+                    audit_entry = {
+                        'timestamp': datetime.utcnow().isoformat(),
+                        'user_id': str(current_user.id) if current_user else None,
+                        'username': username,
+                        'action_type': action_type,
+                        'resource': audit_resource,
+                        'target_id': str(audit_target_id) if audit_target_id else None,
+                        'status': status,
+                        'status_code': status_code,
+                        'duration_ms': round(duration * 1000, 2),
+                        'client_ip': client_ip,
+                        'user_agent': user_agent,
+                        'emergency_override_id': emergency_override_id,
+                        'details': details
+                    }
+                    
+                    # Hand off to the audit thread (formatted lazily by logging)
+                    log_args = (
+                        action_type, username or 'Anonymous', audit_resource,
+                        audit_target_id or '', status, status_code, duration * 1000
+                    )
+                    if emergency_override_id:
+                        _enqueue_audit(
+                            logger, logging.WARNING, AUDIT_LOG_FORMAT + " [EMERGENCY OVERRIDE: %s]",
+                            log_args + (emergency_override_id,), audit_entry
+                        )
+                    else:
+                        _enqueue_audit(logger, logging.INFO, AUDIT_LOG_FORMAT, log_args, audit_entry)
             
             return result
         return decorated_function
@@ -301,12 +384,17 @@ def validate_village_assignment(f):
             return jsonify({'error': 'Authentication required'}), 401
         
         # Super Admin bypasses this check
-        if current_user.has_role('superadmin'):
+        if _is_superadmin(current_user):
             return f(*args, **kwargs)
         
-        # Check if user has any active village assignments
-        active_assignments = current_user.get_village_assignments(active_only=True)
-        if not active_assignments:
+        # Check if user has any active village assignments (stops at the first row)
+        if '_has_village_assignment' not in g:
+            g._has_village_assignment = db.session.query(UserVillage.id).filter_by(
+                user_id=current_user.id,
+                is_active=True
+            ).limit(1).scalar() is not None
+        
+        if not g._has_village_assignment:
             return jsonify({
                 'error': 'No active village assignments found',
                 'code': 'NO_VILLAGE_ASSIGNMENT',
@@ -325,7 +413,7 @@ def check_village_permission(village_id, permission_type):
         return False
     
     # Super Admin has all permissions
-    if current_user.has_role('superadmin'):
+    if _is_superadmin(current_user):
         return True
     
     # Check village assignment and permission
@@ -350,12 +438,17 @@ def get_user_villages_scope():
         return []
     
     # Super Admin can access all villages
-    if current_user.has_role('superadmin'):
+    if _is_superadmin(current_user):
         return None  # None means all villages
     
-    # Get assigned village IDs
-    assignments = current_user.get_village_assignments(active_only=True)
-    return [str(assignment.village_id) for assignment in assignments]
+    # Get assigned village IDs (column-only query, once per request)
+    if '_village_scope' not in g:
+        rows = UserVillage.query.with_entities(UserVillage.village_id).filter_by(
+            user_id=current_user.id,
+            is_active=True
+        ).all()
+        g._village_scope = [str(village_id) for (village_id,) in rows]
+    return g._village_scope
 
 def require_same_user_or_admin(user_id_param='user_id'):
     """
@@ -372,7 +465,7 @@ def require_same_user_or_admin(user_id_param='user_id'):
             target_user_id = kwargs.get(user_id_param)
             
             # Super Admin can access any user
-            if current_user.has_role('superadmin'):
+            if _is_superadmin(current_user):
                 return f(*args, **kwargs)
             
             # User can access their own data
@@ -406,15 +499,16 @@ def register_security_middleware(app):
     
     @app.before_request
     def before_request():
-        # Clean up expired emergency overrides periodically
-        # This could be moved to a background task in production
-        if hasattr(g, 'override_cleanup_done'):
+        # Clean up expired emergency overrides at most once per interval per worker;
+        # check_override already ignores expired rows, so this is housekeeping only
+        global _next_override_cleanup
+        now = time.monotonic()
+        if now < _next_override_cleanup:
             return
+        _next_override_cleanup = now + OVERRIDE_CLEANUP_INTERVAL
         
-        # Run cleanup once per request cycle (not efficient, but works for demo)
         try:
             EmergencyOverride.cleanup_expired()
-            g.override_cleanup_done = True
         except Exception as e:
             current_app.logger.error(f"Error during automatic override cleanup: {str(e)}")
     
@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import joinedload
 from src.models.user import db
+from src.utils.search import LIKE_ESCAPE, contains_pattern
 
 class Property(db.Model):
     """Property model for managing village properties"""
@@ -7,31 +10,33 @@ class Property(db.Model):
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     address = db.Column(db.Text, nullable=False)
-    property_type_id = db.Column(db.Integer, db.ForeignKey('property_types.id'), nullable=False)
-    property_status_id = db.Column(db.Integer, db.ForeignKey('property_statuses.id'), nullable=False)
+    property_type_id = db.Column(db.Integer, db.ForeignKey('property_types.id'), nullable=False, index=True)
+    property_status_id = db.Column(db.Integer, db.ForeignKey('property_statuses.id'), nullable=False, index=True)
     bedrooms = db.Column(db.Integer)
     bathrooms = db.Column(db.Integer)
     description = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    def __init__(self, address, property_type_id, property_status_id, bedrooms=None, bathrooms=None, description=None):
-        self.address = address
-        self.property_type_id = property_type_id
-        self.property_status_id = property_status_id
-        self.bedrooms = bedrooms
-        self.bathrooms = bathrooms
-        self.description = description
+    # Lists filter by status/type and page newest-first on (created_at, id);
+    # B-tree indexes are read backwards for DESC order
+    __table_args__ = (
+        db.Index('ix_property_status_created', 'property_status_id', 'created_at', 'id'),
+        db.Index('ix_property_type_created', 'property_type_id', 'created_at', 'id'),
+        db.Index('ix_property_created', 'created_at', 'id'),
+    )
     
     def to_dict(self):
         """Convert Property to dictionary"""
+        property_type = self.property_type
+        property_status = self.property_status
         return {
             'id': self.id,
             'address': self.address,
             'property_type_id': self.property_type_id,
-            'property_type': self.property_type.to_dict() if self.property_type else None,
+            'property_type': property_type.to_dict() if property_type else None,
             'property_status_id': self.property_status_id,
-            'property_status': self.property_status.to_dict() if self.property_status else None,
+            'property_status': property_status.to_dict() if property_status else None,
             'bedrooms': self.bedrooms,
             'bathrooms': self.bathrooms,
             'description': self.description,
@@ -41,14 +46,16 @@ class Property(db.Model):
     
     def to_dict_simple(self):
         """Convert Property to simple dictionary (without nested objects)"""
+        property_type = self.property_type
+        property_status = self.property_status
         return {
             'id': self.id,
             'address': self.address,
             'property_type_id': self.property_type_id,
-            'property_type_name': self.property_type.name if self.property_type else None,
+            'property_type_name': property_type.name if property_type else None,
             'property_status_id': self.property_status_id,
-            'property_status_name': self.property_status.name if self.property_status else None,
-            'property_status_color': self.property_status.color if self.property_status else None,
+            'property_status_name': property_status.name if property_status else None,
+            'property_status_color': property_status.color if property_status else None,
             'bedrooms': self.bedrooms,
             'bathrooms': self.bathrooms,
             'description': self.description,
@@ -56,6 +63,52 @@ class Property(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @classmethod
+    def query_with_relations(cls):
+        """Property query that loads type and status in the same round-trip"""
+        return cls.query.options(joinedload(cls.property_type), joinedload(cls.property_status))
+    
+    @classmethod
+    def select_simple(cls):
+        """Core select of the to_dict_simple() columns, with type and status names outer-joined"""
+        from src.models.property_type_model import PropertyType
+        from src.models.property_status_model import PropertyStatus
+        
+        return select(
+            cls.id,
+            cls.address,
+            cls.property_type_id,
+            PropertyType.name.label('property_type_name'),
+            cls.property_status_id,
+            PropertyStatus.name.label('property_status_name'),
+            PropertyStatus.color.label('property_status_color'),
+            cls.bedrooms,
+            cls.bathrooms,
+            cls.description,
+            cls.created_at,
+            cls.updated_at
+        ).select_from(cls)\
+         .outerjoin(PropertyType, cls.property_type_id == PropertyType.id)\
+         .outerjoin(PropertyStatus, cls.property_status_id == PropertyStatus.id)
+    
+    @staticmethod
+    def simple_dicts(rows):
+        """to_dict_simple()-shaped dictionaries from select_simple() mapping rows (no ORM objects)"""
+        result = []
+        for row in rows:
+            data = dict(row)
+            data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+            data['updated_at'] = data['updated_at'].isoformat() if data['updated_at'] else None
+            result.append(data)
+        return result
+    
+    @classmethod
+    def to_dict_bulk(cls, properties=None):
+        """Convert many properties to simple dictionaries (all properties if none are given)"""
+        if properties is None:
+            properties = cls.query_with_relations().all()
+        return [prop.to_dict_simple() for prop in properties]
+    
     def update(self, **kwargs):
         """Update Property attributes"""
         for key, value in kwargs.items():
@@ -73,10 +126,18 @@ class Property(db.Model):
         """Get properties by type"""
         return cls.query.filter_by(property_type_id=type_id).all()
     
+    @classmethod
+    def address_contains(cls, search_term):
+        """Case-insensitive substring filter on address (served by idx_properties_address_trgm on PostgreSQL)
+        
+        LIKE wildcards in the search term are escaped so they match literally.
+        """
+        return cls.address.ilike(bindparam('address_search', contains_pattern(search_term)), escape=LIKE_ESCAPE)
+    
     @classmethod
     def search_by_address(cls, search_term):
         """Search properties by address"""
-        return cls.query.filter(cls.address.contains(search_term)).all()
+        return cls.query.filter(cls.address_contains(search_term)).all()
     
     @classmethod
     def get_statistics(cls):
@@ -84,27 +145,29 @@ class Property(db.Model):
         from sqlalchemy import func
         from src.models.property_status_model import PropertyStatus
         
-        # Get total count
-        total_count = cls.query.count()
-        
-        # Get count by status
-        status_counts = db.session.query(
-            PropertyStatus.name,
-            PropertyStatus.color,
-            func.count(cls.id).label('count')
-        ).outerjoin(cls, PropertyStatus.id == cls.property_status_id)\
-         .group_by(PropertyStatus.id, PropertyStatus.name, PropertyStatus.color)\
-         .all()
+        # Every status with its property count (zero included) in one aggregate query;
+        # property_status_id is a NOT NULL foreign key, so the counts sum to the total
+        rows = db.session.execute(
+            select(PropertyStatus.name, PropertyStatus.color, func.count(cls.id))
+            .outerjoin(cls, PropertyStatus.id == cls.property_status_id)
+            .group_by(PropertyStatus.id, PropertyStatus.name, PropertyStatus.color)
+            .order_by(PropertyStatus.id)
+        ).all()
         
+        return cls.statistics_from_rows(rows)
+    
+    @staticmethod
+    def statistics_from_rows(rows):
+        """get_statistics payload from (status name, color, property count) rows"""
         return {
-            'total': total_count,
+            'total': sum(row[2] for row in rows),
             'by_status': [
                 {
-                    'status': status.name,
-                    'color': status.color,
-                    'count': status.count
+                    'status': name,
+                    'color': color,
+                    'count': count
                 }
-                for status in status_counts
+                for name, color, count in rows
             ]
         }
     
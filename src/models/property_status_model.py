@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property, selectinload
 from src.models.user import db
+from src.models.property_model import Property
 
 class PropertyStatus(db.Model):
     """Property Status model for managing property status categories"""
@@ -13,8 +16,21 @@ class PropertyStatus(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    # Relationship with properties
-    properties = db.relationship('Property', backref='property_status', lazy=True)
+    # Active lists are filtered on is_active and ordered by name
+    __table_args__ = (
+        db.Index('ix_ps_active_name', 'is_active', 'name'),
+    )
+    
+    # Relationship with properties; the collection can be large, so it is never lazy
+    # loaded (use get_with_properties); Property.property_status still loads on access
+    properties = db.relationship('Property', backref='property_status', lazy='raise_on_sql')
+    
+    # Number of properties with this status, loaded on first access by one COUNT subquery
+    # instead of materializing every related Property
+    property_count = column_property(
+        select(func.count(Property.id)).where(Property.property_status_id == id).correlate_except(Property).scalar_subquery(),
+        deferred=True
+    )
     
     def __init__(self, name, color='#3B82F6', description=None, is_active=True):
         self.name = name
@@ -32,7 +48,7 @@ class PropertyStatus(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'property_count': len(self.properties) if self.properties else 0
+            'property_count': self.property_count
         }
     
     def update(self, **kwargs):
@@ -47,6 +63,36 @@ class PropertyStatus(db.Model):
         """Get all active property statuses"""
         return cls.query.filter_by(is_active=True).order_by(cls.name).all()
     
+    @classmethod
+    def list_dicts(cls, include_inactive=False):
+        """Active (or all) property statuses as dictionaries, read as plain rows with property counts"""
+        stmt = select(
+            cls.id, cls.name, cls.color, cls.description, cls.is_active, cls.created_at, cls.updated_at,
+            func.count(Property.id).label('property_count')
+        ).outerjoin(Property, Property.property_status_id == cls.id).group_by(cls.id).order_by(cls.name)
+        
+        if not include_inactive:
+            stmt = stmt.where(cls.is_active == True)
+        
+        return [
+            {
+                'id': row.id,
+                'name': row.name,
+                'color': row.color,
+                'description': row.description,
+                'is_active': row.is_active,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+                'property_count': row.property_count
+            }
+            for row in db.session.execute(stmt)
+        ]
+    
+    @classmethod
+    def get_with_properties(cls, status_id):
+        """Get property status with its properties loaded by one extra query"""
+        return db.session.get(cls, status_id, options=[selectinload(cls.properties)], populate_existing=True)
+    
     @classmethod
     def get_by_name(cls, name):
         """Get property status by name"""
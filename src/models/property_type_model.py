@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import column_property, selectinload
 from src.models.user import db
+from src.models.property_model import Property
 
 class PropertyType(db.Model):
     """Property Type model for managing property categories"""
@@ -12,8 +15,21 @@ class PropertyType(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    # Relationship with properties
-    properties = db.relationship('Property', backref='property_type', lazy=True)
+    # Active lists are filtered on is_active and ordered by name
+    __table_args__ = (
+        db.Index('ix_pt_active_name', 'is_active', 'name'),
+    )
+    
+    # Relationship with properties; the collection can be large, so it is never lazy
+    # loaded (use get_with_properties); Property.property_type still loads on access
+    properties = db.relationship('Property', backref='property_type', lazy='raise_on_sql')
+    
+    # Number of properties with this type, loaded on first access by one COUNT subquery
+    # instead of materializing every related Property
+    property_count = column_property(
+        select(func.count(Property.id)).where(Property.property_type_id == id).correlate_except(Property).scalar_subquery(),
+        deferred=True
+    )
     
     def __init__(self, name, description=None, is_active=True):
         self.name = name
@@ -29,7 +45,7 @@ class PropertyType(db.Model):
             'is_active': self.is_active,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'property_count': len(self.properties) if self.properties else 0
+            'property_count': self.property_count
         }
     
     def update(self, **kwargs):
@@ -44,6 +60,35 @@ class PropertyType(db.Model):
         """Get all active property types"""
         return cls.query.filter_by(is_active=True).order_by(cls.name).all()
     
+    @classmethod
+    def list_dicts(cls, include_inactive=False):
+        """Active (or all) property types as dictionaries, read as plain rows with property counts"""
+        stmt = select(
+            cls.id, cls.name, cls.description, cls.is_active, cls.created_at, cls.updated_at,
+            func.count(Property.id).label('property_count')
+        ).outerjoin(Property, Property.property_type_id == cls.id).group_by(cls.id).order_by(cls.name)
+        
+        if not include_inactive:
+            stmt = stmt.where(cls.is_active == True)
+        
+        return [
+            {
+                'id': row.id,
+                'name': row.name,
+                'description': row.description,
+                'is_active': row.is_active,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+                'property_count': row.property_count
+            }
+            for row in db.session.execute(stmt)
+        ]
+    
+    @classmethod
+    def get_with_properties(cls, type_id):
+        """Get property type with its properties loaded by one extra query"""
+        return db.session.get(cls, type_id, options=[selectinload(cls.properties)], populate_existing=True)
+    
     @classmethod
     def get_by_name(cls, name):
         """Get property type by name"""
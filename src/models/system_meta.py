@@ -0,0 +1,28 @@
+"""
+System Metadata Model for Smart Village Management System
+Key/value settings the application records about its own database
+"""
+
+from src.models.user import db
+from datetime import datetime
+
+class SystemMeta(db.Model):
+    """Key/value metadata such as the version of the seeded default data"""
+    __tablename__ = 'system_meta'
+    
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(255), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    @classmethod
+    def get_value(cls, key):
+        """Value stored under key, or None"""
+        return db.session.scalar(db.select(cls.value).where(cls.key == key))
+    
+    @classmethod
+    def set_value(cls, key, value):
+        """Insert or update the value stored under key"""
+        db.session.merge(cls(key=key, value=value))
+    
+    def __repr__(self):
+        return f'<SystemMeta {self.key}={self.value}>'
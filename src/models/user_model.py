@@ -1,9 +1,19 @@
+from flask import current_app
 from src.models.user import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from src.utils.password_hashing import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+# werkzeug method spec for new password hashes, spelled out in full as werkzeug stores it
+# in the hash prefix so stored hashes can be compared against it
+DEFAULT_PASSWORD_HASH_METHOD = 'pbkdf2:sha256:600000'
+
+def password_hash_method():
+    """The configured PASSWORD_HASH_METHOD"""
+    return current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_PASSWORD_HASH_METHOD)
 
 # Association tables for many-to-many relationships
 user_roles = db.Table('user_roles',
@@ -52,6 +62,7 @@ class User(db.Model):
                            backref=db.backref('users', lazy=True))
     sessions = db.relationship('UserSession', backref='user', lazy=True, cascade='all, delete-orphan')
     audit_logs = db.relationship('AuditLog', backref='user', lazy=True)
+    village_assignments = db.relationship('UserVillage', foreign_keys='UserVillage.user_id', back_populates='user')
     
     def __init__(self, **kwargs):
         super(User, self).__init__(**kwargs)
@@ -63,7 +74,20 @@ class User(db.Model):
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=password_hash_method())
+        self.password_changed_at = datetime.utcnow()
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash was made with a method other than PASSWORD_HASH_METHOD"""
+        return self.password_hash.split('$', 1)[0] != password_hash_method()
+    
+    def rehash_password(self, password):
+        """Re-hash a verified password with the configured method (not a password change)"""
+        self.password_hash = generate_password_hash(password, method=password_hash_method())
+    
+    def set_password_hash(self, password_hash):
+        """Set an already computed password hash"""
+        self.password_hash = password_hash
         self.password_changed_at = datetime.utcnow()
     
     def check_password(self, password):
@@ -107,13 +131,17 @@ class User(db.Model):
                 return True
         return False
     
+    def has_admin_permission(self):
+        """Check if user holds any admin permission"""
+        return any(
+            permission.resource == 'admin' or permission.name == 'system.admin'
+            for role in self.roles
+            for permission in role.permissions
+        )
+    
     def get_permissions(self):
-        """Get all permissions for user"""
-        permissions = set()
-        for role in self.roles:
-            for permission in role.permissions:
-                permissions.add(permission.name)
-        return list(permissions)
+        """Get all permission names for user, deduplicated across roles"""
+        return list({permission.name for role in self.roles for permission in role.permissions})
     
     @property
     def full_name(self):
@@ -161,137 +189,6 @@ class User(db.Model):
         
         return data
     
-    def __repr__(self):
-        return f'<User {self.username}>'
-
-class Role(db.Model):
-    """Role model for role-based access control"""
-    __tablename__ = 'roles'
-    
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = db.Column(db.String(50), unique=True, nullable=False)
-    description = db.Column(db.Text)
-    is_system_role = db.Column(db.Boolean, default=False)
-    
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Relationships
-    permissions = db.relationship('Permission', secondary=role_permissions, lazy='subquery',
-                                 backref=db.backref('roles', lazy=True))
-    
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'description': self.description,
-            'is_system_role': self.is_system_role,
-            'permissions': [perm.name for perm in self.permissions],
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
-    
-    def __repr__(self):
-        return f'<Role {self.name}>'
-
-class Permission(db.Model):
-    """Permission model for fine-grained access control"""
-    __tablename__ = 'permissions'
-    
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = db.Column(db.String(100), unique=True, nullable=False)
-    description = db.Column(db.Text)
-    resource = db.Column(db.String(50), nullable=False)  # e.g., 'users', 'properties', 'finance'
-    action = db.Column(db.String(20), nullable=False)    # e.g., 'create', 'read', 'update', 'delete'
-    
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'description': self.description,
-            'resource': self.resource,
-            'action': self.action,
-            'created_at': self.created_at.isoformat()
-        }
-    
-    def __repr__(self):
-        return f'<Permission {self.name}>'
-
-class UserSession(db.Model):
-    """User session model for tracking active sessions"""
-    __tablename__ = 'user_sessions'
-    
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
-    token_jti = db.Column(db.String(36), unique=True, nullable=False)
-    ip_address = db.Column(db.String(45))
-    user_agent = db.Column(db.Text)
-    is_active = db.Column(db.Boolean, default=True)
-    
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_activity = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
-    
-    def is_expired(self):
-        return datetime.utcnow() > self.expires_at
-    
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'token_jti': self.token_jti,
-            'ip_address': self.ip_address,
-            'user_agent': self.user_agent,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'last_activity': self.last_activity.isoformat(),
-            'expires_at': self.expires_at.isoformat(),
-            'is_expired': self.is_expired()
-        }
-
-class AuditLog(db.Model):
-    """Audit log model for tracking user actions"""
-    __tablename__ = 'audit_logs'
-    
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=True)
-    action = db.Column(db.String(100), nullable=False)
-    resource_type = db.Column(db.String(50))
-    resource_id = db.Column(db.String(100))
-    details = db.Column(db.JSON)
-    ip_address = db.Column(db.String(45))
-    user_agent = db.Column(db.Text)
-    
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'user_id': str(self.user_id) if self.user_id else None,
-            'action': self.action,
-            'resource_type': self.resource_type,
-            'resource_id': self.resource_id,
-            'details': self.details,
-            'ip_address': self.ip_address,
-            'user_agent': self.user_agent,
-            'created_at': self.created_at.isoformat()
-        }
-
-# Event listeners for automatic timestamp updates
-@event.listens_for(User, 'before_update')
-def update_user_timestamp(mapper, connection, target):
-    target.updated_at = datetime.utcnow()
-
-@event.listens_for(Role, 'before_update')
-def update_role_timestamp(mapper, connection, target):
-    target.updated_at = datetime.utcnow()
-
-
     # Village-related methods
     def get_assigned_villages(self, active_only=True):
         """Get villages assigned to this user"""
@@ -310,7 +207,7 @@ def update_role_timestamp(mapper, connection, target):
         """Get user-village assignments"""
         from src.models.user_village import UserVillage
         
-        query = UserVillage.query.filter_by(user_id=self.id)
+        query = UserVillage.query.filter_by(user_id=self.id).options(selectinload(UserVillage.village))
         if active_only:
             query = query.filter_by(is_active=True)
         
@@ -323,13 +220,7 @@ def update_role_timestamp(mapper, connection, target):
             return True
         
         from src.models.user_village import UserVillage
-        assignment = UserVillage.query.filter_by(
-            user_id=self.id,
-            village_id=village_id,
-            is_active=True
-        ).first()
-        
-        return assignment is not None
+        return UserVillage.check_user_village_access(self.id, village_id)
     
     def get_primary_village(self):
         """Get user's primary village"""
@@ -338,7 +229,7 @@ def update_role_timestamp(mapper, connection, target):
             user_id=self.id,
             is_primary=True,
             is_active=True
-        ).first()
+        ).options(selectinload(UserVillage.village)).first()
         
         return assignment.village if assignment else None
     
@@ -433,7 +324,8 @@ def update_role_timestamp(mapper, connection, target):
             return self.has_village_access(village_id)
         
         # If no village specified, user must have at least one village
-        return len(self.get_assigned_villages()) > 0
+        from src.models.user_village import UserVillage
+        return UserVillage.user_has_any_village(self.id)
     
     def check_resource_access(self, resource, action, village_id=None, target_id=None):
         """Comprehensive resource access check"""
@@ -474,4 +366,133 @@ def update_role_timestamp(mapper, connection, target):
         data['can_emergency_override'] = self.can_emergency_override()
         
         return data
+    
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+class Role(db.Model):
+    """Role model for role-based access control"""
+    __tablename__ = 'roles'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    description = db.Column(db.Text)
+    is_system_role = db.Column(db.Boolean, default=False)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    permissions = db.relationship('Permission', secondary=role_permissions, lazy='subquery',
+                                 backref=db.backref('roles', lazy=True))
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'description': self.description,
+            'is_system_role': self.is_system_role,
+            'permissions': [perm.name for perm in self.permissions],
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<Role {self.name}>'
+
+class Permission(db.Model):
+    """Permission model for fine-grained access control"""
+    __tablename__ = 'permissions'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    description = db.Column(db.Text)
+    resource = db.Column(db.String(50), nullable=False)  # e.g., 'users', 'properties', 'finance'
+    action = db.Column(db.String(20), nullable=False)    # e.g., 'create', 'read', 'update', 'delete'
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'description': self.description,
+            'resource': self.resource,
+            'action': self.action,
+            'created_at': self.created_at.isoformat()
+        }
+    
+    def __repr__(self):
+        return f'<Permission {self.name}>'
 
+class UserSession(db.Model):
+    """User session model for tracking active sessions"""
+    __tablename__ = 'user_sessions'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    token_jti = db.Column(db.String(36), unique=True, nullable=False)
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.Text)
+    is_active = db.Column(db.Boolean, default=True)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    def is_expired(self):
+        return datetime.utcnow() > self.expires_at
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'token_jti': self.token_jti,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat(),
+            'last_activity': self.last_activity.isoformat(),
+            'expires_at': self.expires_at.isoformat(),
+            'is_expired': self.is_expired()
+        }
+
+class AuditLog(db.Model):
+    """Audit log model for tracking user actions"""
+    __tablename__ = 'audit_logs'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=True)
+    action = db.Column(db.String(100), nullable=False)
+    resource_type = db.Column(db.String(50))
+    resource_id = db.Column(db.String(100))
+    details = db.Column(db.JSON)
+    ip_address = db.Column(db.String(45))
+    user_agent = db.Column(db.Text)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'user_id': str(self.user_id) if self.user_id else None,
+            'action': self.action,
+            'resource_type': self.resource_type,
+            'resource_id': self.resource_id,
+            'details': self.details,
+            'ip_address': self.ip_address,
+            'user_agent': self.user_agent,
+            'created_at': self.created_at.isoformat()
+        }
+
+# Event listeners for automatic timestamp updates
+@event.listens_for(User, 'before_update')
+def update_user_timestamp(mapper, connection, target):
+    target.updated_at = datetime.utcnow()
+
+@event.listens_for(Role, 'before_update')
+def update_role_timestamp(mapper, connection, target):
+    target.updated_at = datetime.utcnow()
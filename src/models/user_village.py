@@ -7,18 +7,34 @@ from src.models.user import db
 from datetime import datetime
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import event
+from sqlalchemy import event, update
+from sqlalchemy.orm import selectinload
+
+# permission_cache key for active-assignment checks; entries are dropped by its UserVillage listeners
+VILLAGE_ASSIGNMENT_CACHE_KEY = 'village_assignment'
+
+# has_village_permission type -> assignment column holding it
+VILLAGE_PERMISSION_ATTRS = {
+    'properties': 'can_manage_properties',
+    'residents': 'can_manage_residents',
+    'finances': 'can_manage_finances',
+    'reports': 'can_view_reports'
+}
+
+def _as_uuid(value):
+    """Bind value for a UUID column: UUIDs as they are, strings parsed (ValueError if malformed)"""
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
 
 class UserVillage(db.Model):
     """User-Village assignment model for managing user access to villages"""
     __tablename__ = 'user_villages'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    village_id = db.Column(db.String(36), db.ForeignKey('villages.id', ondelete='CASCADE'), nullable=False)
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    village_id = db.Column(UUID(as_uuid=True), db.ForeignKey('villages.id', ondelete='CASCADE'), nullable=False)
     
     # Assignment Details
-    assigned_by = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    assigned_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
     assignment_type = db.Column(db.String(20), default='manual')  # manual, invitation, bulk
     
     # Permissions Scope
@@ -36,21 +52,45 @@ class UserVillage(db.Model):
     activated_at = db.Column(db.DateTime)
     deactivated_at = db.Column(db.DateTime)
     
-    # Relationships
-    user = db.relationship('src.models.user_model.User', foreign_keys=[user_id], backref='village_assignments')
-    assigner = db.relationship('src.models.user_model.User', foreign_keys=[assigned_by], backref='assigned_villages')
+    # Relationships; user, village and assigner raise instead of lazy loading, so
+    # queries that serialize them must selectinload() them
+    user = db.relationship('src.models.user_model.User', foreign_keys=[user_id], back_populates='village_assignments',
+                           lazy='raise_on_sql')
+    village = db.relationship('Village', back_populates='user_assignments', lazy='raise_on_sql')
+    assigner = db.relationship('src.models.user_model.User', foreign_keys=[assigned_by], backref='assigned_villages',
+                               lazy='raise_on_sql')
     
     # Constraints
     __table_args__ = (
         db.UniqueConstraint('user_id', 'village_id', name='unique_user_village'),
-        db.CheckConstraint('assigned_at <= COALESCE(activated_at, CURRENT_TIMESTAMP)', name='check_assigned_before_activated'),
-        db.CheckConstraint('activated_at <= COALESCE(deactivated_at, CURRENT_TIMESTAMP)', name='check_activated_before_deactivated'),
+        # Timestamps are stamped app-side (datetime.utcnow), so the checks only relate them
+        # to each other, never to the database clock (CURRENT_TIMESTAMP follows the session
+        # TimeZone on PostgreSQL and has whole-second text form on SQLite)
+        db.CheckConstraint('activated_at IS NULL OR assigned_at <= activated_at', name='check_assigned_before_activated'),
+        db.CheckConstraint('deactivated_at IS NULL OR activated_at <= deactivated_at', name='check_activated_before_deactivated'),
+        
+        # Partial indexes for the active-assignment lookups in the class methods below
+        # (SQLite only uses a partial index when the query repeats its predicate, hence '= 1')
+        db.Index('ix_uv_user_active', 'user_id',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
+        db.Index('ix_uv_village_active', 'village_id', 'assigned_at',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
+        db.Index('ix_uv_user_primary', 'user_id',
+                 postgresql_where=db.text('is_primary AND is_active'), sqlite_where=db.text('is_primary = 1 AND is_active = 1')),
+        db.Index('ix_uv_assigner_active', 'assigned_by', 'assigned_at',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
+        db.Index('ix_uv_active_assigned', 'assigned_at',
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active = 1')),
     )
     
     def __init__(self, **kwargs):
         super(UserVillage, self).__init__(**kwargs)
-        if self.is_active and not self.activated_at:
-            self.activated_at = datetime.utcnow()
+        if self.is_active and self.activated_at is None:
+            # One app-side clock reading for both, so assigned_at <= activated_at holds
+            now = datetime.utcnow()
+            if self.assigned_at is None:
+                self.assigned_at = now
+            self.activated_at = now
     
     def activate(self):
         """Activate the assignment"""
@@ -69,17 +109,35 @@ class UserVillage(db.Model):
     
     def set_as_primary(self):
         """Set this village as primary for the user"""
-        # First, unset any existing primary village for this user
-        existing_primary = UserVillage.query.filter_by(
-            user_id=self.user_id,
-            is_primary=True
-        ).filter(UserVillage.id != self.id).first()
-        
-        if existing_primary:
-            existing_primary.is_primary = False
+        # One UPDATE sets this row and clears any other primary row of the user;
+        # loaded instances are synchronized by evaluating the same expression in Python
+        if self.id is None:
+            db.session.flush([self])
         
-        # Set this as primary
-        self.is_primary = True
+        db.session.execute(
+            update(UserVillage)
+            .where(
+                UserVillage.user_id == self.user_id,
+                db.or_(UserVillage.is_primary == True, UserVillage.id == self.id)
+            )
+            .values(is_primary=(UserVillage.id == self.id))
+        )
+    
+    @classmethod
+    def set_primary_village(cls, user_id, village_id):
+        """Set the user's assignment to village_id as primary in one UPDATE
+
+        Clears any other primary row of the user in the same statement; pending
+        assignments are autoflushed first, so freshly assigned villages qualify.
+        """
+        db.session.execute(
+            update(cls)
+            .where(
+                cls.user_id == user_id,
+                db.or_(cls.is_primary == True, cls.village_id == village_id)
+            )
+            .values(is_primary=(cls.village_id == village_id))
+        )
     
     def update_permissions(self, **permissions):
         """Update village-specific permissions"""
@@ -98,60 +156,66 @@ class UserVillage(db.Model):
     
     def has_village_permission(self, permission_type):
         """Check if user has specific village permission"""
-        permission_map = {
-            'properties': self.can_manage_properties,
-            'residents': self.can_manage_residents,
-            'finances': self.can_manage_finances,
-            'reports': self.can_view_reports
-        }
-        return permission_map.get(permission_type, False)
+        attr = VILLAGE_PERMISSION_ATTRS.get(permission_type)
+        return getattr(self, attr) if attr else False
     
     @property
     def is_expired(self):
         """Check if assignment is expired (deactivated)"""
-        return not self.is_active or (self.deactivated_at and self.deactivated_at <= datetime.utcnow())
+        return self.is_expired_at(datetime.utcnow())
+    
+    def is_expired_at(self, now):
+        """Check if assignment is expired (deactivated) as of now"""
+        return not self.is_active or (self.deactivated_at and self.deactivated_at <= now)
     
     @property
     def duration_days(self):
         """Get duration of assignment in days"""
-        if self.deactivated_at:
-            end_date = self.deactivated_at
-        else:
-            end_date = datetime.utcnow()
-        
+        return self.duration_days_at(datetime.utcnow())
+    
+    def duration_days_at(self, now):
+        """Get duration of assignment in days as of now"""
+        end_date = self.deactivated_at or now
         start_date = self.activated_at or self.assigned_at
         return (end_date - start_date).days
     
     def to_dict(self, include_user=False, include_village=False, include_assigner=False):
-        """Convert assignment to dictionary"""
+        """Convert assignment to dictionary (selectinload user/village/assigner before including them)"""
+        # UUIDs are left as-is: the orjson provider writes them in canonical string form
+        now = datetime.utcnow()
         data = {
-            'id': str(self.id),
-            'user_id': str(self.user_id),
-            'village_id': str(self.village_id),
+            'id': self.id,
+            'user_id': self.user_id,
+            'village_id': self.village_id,
             'assignment_type': self.assignment_type,
             
-            # Permissions
-            'permissions': self.get_permissions_summary(),
+            # Permissions (same keys as get_permissions_summary, built inline per row)
+            'permissions': {
+                'can_manage_properties': self.can_manage_properties,
+                'can_manage_residents': self.can_manage_residents,
+                'can_manage_finances': self.can_manage_finances,
+                'can_view_reports': self.can_view_reports
+            },
             
             # Status
             'is_active': self.is_active,
             'is_primary': self.is_primary,
-            'is_expired': self.is_expired,
+            'is_expired': self.is_expired_at(now),
             
             # Timestamps
             'assigned_at': self.assigned_at.isoformat(),
             'activated_at': self.activated_at.isoformat() if self.activated_at else None,
             'deactivated_at': self.deactivated_at.isoformat() if self.deactivated_at else None,
-            'duration_days': self.duration_days,
+            'duration_days': self.duration_days_at(now),
             
             # Assignment details
-            'assigned_by': str(self.assigned_by)
+            'assigned_by': self.assigned_by
         }
         
         # Include related objects if requested
         if include_user and self.user:
             data['user'] = {
-                'id': str(self.user.id),
+                'id': self.user.id,
                 'username': self.user.username,
                 'email': self.user.email,
                 'full_name': self.user.full_name
@@ -162,7 +226,7 @@ class UserVillage(db.Model):
         
         if include_assigner and self.assigner:
             data['assigner'] = {
-                'id': str(self.assigner.id),
+                'id': self.assigner.id,
                 'username': self.assigner.username,
                 'full_name': self.assigner.full_name
             }
@@ -172,7 +236,7 @@ class UserVillage(db.Model):
     @classmethod
     def get_user_villages(cls, user_id, active_only=True):
         """Get all villages assigned to a user"""
-        query = cls.query.filter_by(user_id=user_id)
+        query = cls.query.filter_by(user_id=user_id).options(selectinload(cls.village))
         if active_only:
             query = query.filter_by(is_active=True)
         return query.all()
@@ -180,7 +244,7 @@ class UserVillage(db.Model):
     @classmethod
     def get_village_users(cls, village_id, active_only=True):
         """Get all users assigned to a village"""
-        query = cls.query.filter_by(village_id=village_id)
+        query = cls.query.filter_by(village_id=village_id).options(selectinload(cls.user))
         if active_only:
             query = query.filter_by(is_active=True)
         return query.all()
@@ -194,19 +258,28 @@ class UserVillage(db.Model):
             is_active=True
         ).first()
     
+    @classmethod
+    def user_has_any_village(cls, user_id):
+        """Check if user has at least one active village assignment (EXISTS, no rows loaded)"""
+        return db.session.query(
+            cls.query.filter_by(user_id=_as_uuid(user_id), is_active=True).exists()
+        ).scalar()
+    
     @classmethod
     def check_user_village_access(cls, user_id, village_id):
-        """Check if user has access to specific village"""
-        assignment = cls.query.filter_by(
-            user_id=user_id,
-            village_id=village_id,
-            is_active=True
-        ).first()
-        return assignment is not None
+        """Check if user has access to specific village, cached per process like other permission checks"""
+        from src.utils import permission_cache
+        
+        def compute():
+            return db.session.query(
+                cls.query.filter_by(user_id=_as_uuid(user_id), village_id=_as_uuid(village_id), is_active=True).exists()
+            ).scalar()
+        
+        return permission_cache.cached(user_id, VILLAGE_ASSIGNMENT_CACHE_KEY, village_id, compute)
     
     @classmethod
     def assign_user_to_village(cls, user_id, village_id, assigned_by_id, **permissions):
-        """Create or update user-village assignment"""
+        """Create or update user-village assignment (no commit; the caller owns the transaction)"""
         # Check if assignment already exists
         existing = cls.query.filter_by(
             user_id=user_id,
@@ -215,9 +288,9 @@ class UserVillage(db.Model):
         
         if existing:
             # Update existing assignment
-            existing.activate()
             existing.assigned_by = assigned_by_id
             existing.assigned_at = datetime.utcnow()
+            existing.activate()
             existing.update_permissions(**permissions)
             return existing
         else:
@@ -233,15 +306,38 @@ class UserVillage(db.Model):
     
     @classmethod
     def bulk_assign_villages(cls, user_id, village_ids, assigned_by_id, **permissions):
-        """Assign user to multiple villages"""
+        """Assign user to multiple villages
+        
+        Never commits or flushes per row: everything joins the caller's transaction,
+        which commits the whole batch once.
+        """
+        # Ids arrive as strings from request bodies; key by UUID to match loaded rows
+        village_ids = [uuid.UUID(str(village_id)) for village_id in village_ids]
+        
+        # One query for the existing assignments; new ones are inserted together at flush
+        existing = {
+            assignment.village_id: assignment
+            for assignment in cls.query.filter(cls.user_id == user_id, cls.village_id.in_(village_ids))
+        }
+        
         assignments = []
         for village_id in village_ids:
-            assignment = cls.assign_user_to_village(
-                user_id=user_id,
-                village_id=village_id,
-                assigned_by_id=assigned_by_id,
-                **permissions
-            )
+            assignment = existing.get(village_id)
+            if assignment:
+                # Update existing assignment
+                assignment.assigned_by = assigned_by_id
+                assignment.assigned_at = datetime.utcnow()
+                assignment.activate()
+                assignment.update_permissions(**permissions)
+            else:
+                assignment = cls(
+                    user_id=user_id,
+                    village_id=village_id,
+                    assigned_by=assigned_by_id,
+                    **permissions
+                )
+                db.session.add(assignment)
+                existing[village_id] = assignment
             assignments.append(assignment)
         
         # Set first village as primary if no primary exists
@@ -280,17 +376,20 @@ class UserVillage(db.Model):
 @event.listens_for(UserVillage, 'before_insert')
 def set_activated_at_on_insert(mapper, connection, target):
     """Set activated_at when creating active assignment"""
-    if target.is_active and not target.activated_at:
-        target.activated_at = datetime.utcnow()
+    now = datetime.utcnow()
+    if target.assigned_at is None:
+        target.assigned_at = now
+    if target.is_active and target.activated_at is None:
+        target.activated_at = now
 
 @event.listens_for(UserVillage, 'before_update')
 def handle_activation_changes(mapper, connection, target):
     """Handle activation/deactivation changes"""
     # If being activated and no activated_at, set it
-    if target.is_active and not target.activated_at:
+    if target.is_active and target.activated_at is None:
         target.activated_at = datetime.utcnow()
     
     # If being deactivated and no deactivated_at, set it
-    if not target.is_active and target.activated_at and not target.deactivated_at:
+    if not target.is_active and target.activated_at is not None and target.deactivated_at is None:
         target.deactivated_at = datetime.utcnow()
 
@@ -4,16 +4,24 @@ Handles village information and management
 """
 
 from src.models.user import db
+from src.utils.search import LIKE_ESCAPE, contains_pattern
+from collections import defaultdict
 from datetime import datetime
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+import re
+
+# Characters dropped from a name when deriving its code prefix (anything but letters,
+# Thai included), and the 3-digit counter that follows the prefix
+_CODE_NON_LETTERS = re.compile(r'[\W\d_]+')
+_CODE_SUFFIX = re.compile(r'\d{3}')
 
 class Village(db.Model):
     """Village model for managing village information"""
     __tablename__ = 'villages'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = db.Column(db.String(100), nullable=False)
     code = db.Column(db.String(20), unique=True, nullable=False, index=True)
     description = db.Column(db.Text)
@@ -42,11 +50,14 @@ class Village(db.Model):
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    created_by = db.Column(db.String(36), db.ForeignKey('users.id'))
-    updated_by = db.Column(db.String(36), db.ForeignKey('users.id'))
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'))
+    updated_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'))
     
     # Relationships
-    user_assignments = db.relationship('UserVillage', backref='village', lazy=True, cascade='all, delete-orphan')
+    # raise_on_sql: load with selectinload() instead of an implicit per-village SELECT;
+    # passive_deletes leaves removing assignments of a deleted village to ON DELETE CASCADE
+    user_assignments = db.relationship('UserVillage', back_populates='village', lazy='raise_on_sql',
+                                       cascade='all, delete-orphan', passive_deletes=True)
     creator = db.relationship('src.models.user_model.User', foreign_keys=[created_by], backref='created_villages')
     updater = db.relationship('src.models.user_model.User', foreign_keys=[updated_by], backref='updated_villages')
     
@@ -59,22 +70,23 @@ class Village(db.Model):
     def generate_code(self):
         """Generate unique village code"""
         # Simple code generation based on name
-        base_code = ''.join([c.upper() for c in self.name if c.isalpha()])[:3]
-        if len(base_code) < 3:
-            base_code = base_code.ljust(3, 'X')
+        base_code = _CODE_NON_LETTERS.sub('', self.name).upper()[:3].ljust(3, 'X')
+        
+        # Load every code sharing the prefix in one query, then take the lowest free number
+        used_numbers = set()
+        for code in db.session.scalars(db.select(Village.code).where(Village.code.like(f'{base_code}%'))):
+            match = _CODE_SUFFIX.fullmatch(code, len(base_code))
+            if match:
+                used_numbers.add(int(match.group()))
         
-        # Find next available number
         counter = 1
-        while True:
-            code = f"{base_code}{counter:03d}"
-            existing = Village.query.filter_by(code=code).first()
-            if not existing:
-                return code
+        while counter in used_numbers:
             counter += 1
+        return f"{base_code}{counter:03d}"
     
     def get_assigned_users(self, active_only=True):
-        """Get users assigned to this village"""
-        query = db.session.query(User).join(UserVillage).filter(
+        """Get users assigned to this village (roles loaded in one extra query)"""
+        query = db.session.query(User).join(User.village_assignments).options(selectinload(User.roles)).filter(
             UserVillage.village_id == self.id
         )
         if active_only:
@@ -82,14 +94,46 @@ class Village(db.Model):
         return query.all()
     
     def get_village_admins(self):
-        """Get village admins assigned to this village"""
-        from src.models.user_model import User, Role, user_roles
-        return db.session.query(User).join(UserVillage).join(user_roles).join(Role).filter(
+        """Get village admins assigned to this village (roles loaded in one extra query)"""
+        from src.models.user_model import User, Role
+        return db.session.query(User).join(User.village_assignments).join(User.roles).options(
+            selectinload(User.roles)
+        ).filter(
             UserVillage.village_id == self.id,
             UserVillage.is_active == True,
             Role.name == 'village_admin'
         ).all()
     
+    @classmethod
+    def bulk_village_admins(cls, village_ids):
+        """Village admins of several villages in one query, as {village_id: [User]}"""
+        from src.models.user_model import User, Role
+        rows = db.session.query(UserVillage.village_id, User).select_from(UserVillage).join(
+            User, User.id == UserVillage.user_id
+        ).join(User.roles).filter(
+            UserVillage.village_id.in_(village_ids),
+            UserVillage.is_active == True,
+            Role.name == 'village_admin'
+        ).all()
+        
+        admins = defaultdict(list)
+        for village_id, user in rows:
+            admins[village_id].append(user)
+        return admins
+    
+    def count_village_admins(self):
+        """Count active village admins assigned to this village without loading them"""
+        from src.models.user_model import Role, user_roles
+        return db.session.query(db.func.count(db.distinct(UserVillage.user_id))).join(
+            user_roles, user_roles.c.user_id == UserVillage.user_id
+        ).join(
+            Role, Role.id == user_roles.c.role_id
+        ).filter(
+            UserVillage.village_id == self.id,
+            UserVillage.is_active == True,
+            Role.name == 'village_admin'
+        ).scalar()
+    
     def assign_user(self, user_id, assigned_by_id, **permissions):
         """Assign a user to this village"""
         from src.models.user_village import UserVillage
@@ -201,7 +245,7 @@ class Village(db.Model):
     def to_summary(self):
         """Convert village to summary dictionary (minimal info)"""
         return {
-            'id': str(self.id),
+            'id': self.id,
             'name': self.name,
             'code': self.code,
             'province': self.province,
@@ -211,6 +255,12 @@ class Village(db.Model):
             'total_residents': self.total_residents
         }
     
+    @classmethod
+    def summary_columns(cls):
+        """Columns behind to_summary (named like its keys), for queries that skip loading villages"""
+        return (cls.id, cls.name, cls.code, cls.province, cls.district,
+                cls.is_active, cls.total_properties, cls.total_residents)
+    
     @classmethod
     def get_by_code(cls, code):
         """Get village by code"""
@@ -229,8 +279,8 @@ class Village(db.Model):
         if query:
             search = search.filter(
                 db.or_(
-                    cls.name.ilike(f'%{query}%'),
-                    cls.code.ilike(f'%{query}%')
+                    cls.name.ilike(contains_pattern(query), escape=LIKE_ESCAPE),
+                    cls.code.ilike(contains_pattern(query), escape=LIKE_ESCAPE)
                 )
             )
         
@@ -245,11 +295,6 @@ class Village(db.Model):
     def __repr__(self):
         return f'<Village {self.code}: {self.name}>'
 
-# Event listeners for automatic timestamp updates
-@event.listens_for(Village, 'before_update')
-def update_village_timestamp(mapper, connection, target):
-    target.updated_at = datetime.utcnow()
-
 # Import UserVillage to avoid circular imports
 from src.models.user_village import UserVillage
 from src.models.user_model import User
@@ -1,32 +1,145 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db
 from src.models.property_type_model import PropertyType
-from src.models.user_model import User
+from src.models.property_status_model import PropertyStatus
+from src.models.property_model import Property
+from src.models.user_model import User, Role
+from src.utils import permission_cache, response_cache
+from sqlalchemy import func, literal, null, select, union_all, update
+from sqlalchemy.orm import raiseload, selectinload
+from dataclasses import dataclass, field, fields
 from functools import wraps
+import orjson
+import re
+import uuid
 
 admin_bp = Blueprint('admin', __name__)
 
+# Query-string values accepted as true for boolean flags
+_TRUE_SET = frozenset({'true', '1', 'yes', 'on', 'y'})
+
+# Hex color code, e.g. #3B82F6
+_HEX_COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}\Z')
+
+def _validate_color(color):
+    """Return the stripped color if it is a valid hex color code, otherwise None"""
+    color = color.strip()
+    return color if _HEX_COLOR_RE.match(color) else None
+
+@dataclass
+class PropertyTypeIn:
+    """Property type create/update body"""
+    name: str = ''
+    description: str = ''
+    is_active: bool = True
+    provided: frozenset = field(default=frozenset(), compare=False)
+
+@dataclass
+class PropertyStatusIn:
+    """Property status create/update body"""
+    name: str = ''
+    color: str = ''
+    description: str = ''
+    is_active: bool = True
+    provided: frozenset = field(default=frozenset(), compare=False)
+
+def _decode_body(schema):
+    """Decode the JSON body into a schema dataclass, type-checking and stripping strings in one pass
+    
+    Returns None for an empty or non-object body; raises ValueError on a wrongly typed field.
+    """
+    try:
+        data = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return None
+    
+    if not data or not isinstance(data, dict):
+        return None
+    
+    values = {}
+    for schema_field in fields(schema):
+        name = schema_field.name
+        if name == 'provided' or name not in data:
+            continue
+        value = data[name]
+        if schema_field.type is str:
+            if value is None:
+                value = ''
+            elif isinstance(value, str):
+                value = value.strip()
+            else:
+                raise ValueError(f'{name} must be a string')
+        elif not isinstance(value, schema_field.type):
+            raise ValueError(f'{name} must be a {schema_field.type.__name__}')
+        values[name] = value
+    
+    return schema(provided=frozenset(values), **values)
+
+def _name_exists(model, name):
+    """Whether a row with this name exists (served by the unique index on name)"""
+    return db.session.execute(
+        select(literal(True)).where(model.name == name).limit(1)
+    ).scalar() is not None
+
+def _toggle_active(model, row_id, property_fk):
+    """Flip is_active with UPDATE ... RETURNING and build the to_dict() payload from the returned row"""
+    row = db.session.execute(
+        update(model)
+        .where(model.id == row_id)
+        .values(is_active=~model.is_active)
+        .returning(*model.__table__.columns)
+    ).one_or_none()
+    
+    if row is None:
+        return None
+    
+    data = dict(row._mapping)
+    data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+    data['updated_at'] = data['updated_at'].isoformat() if data['updated_at'] else None
+    data['property_count'] = db.session.execute(
+        select(func.count(Property.id)).where(property_fk == row_id)
+    ).scalar()
+    return data
+
+def _error(message, status):
+    """{'success': False, 'message': ...} error response built from a pre-encoded byte template"""
+    body = b'{"message":' + orjson.dumps(message) + b',"success":false}\n'
+    return Response(body, status=status, mimetype='application/json')
+
+# permission_cache key for the "any admin permission" check
+ADMIN_PERMISSION_KEY = 'admin.*'
+
+def _user_is_admin(user_id):
+    """Whether the user holds an admin permission (None if the user does not exist)"""
+    # Load roles and their permissions up front (one query per level)
+    user = db.session.get(
+        User,
+        user_id,
+        options=[selectinload(User.roles).selectinload(Role.permissions)]
+    )
+    
+    if not user:
+        return None
+    
+    return user.has_admin_permission()
+
 def admin_required(f):
     """Decorator to require admin permissions"""
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        if isinstance(current_user_id, str):
+            current_user_id = uuid.UUID(current_user_id)
         
-        if not user:
-            return jsonify({'message': 'User not found'}), 404
+        # Admin status rarely changes; resolve it from the permission cache
+        has_admin_permission = permission_cache.cached(
+            current_user_id, ADMIN_PERMISSION_KEY, None, lambda: _user_is_admin(current_user_id)
+        )
         
-        # Check if user has admin permissions
-        has_admin_permission = False
-        for role in user.roles:
-            for permission in role.permissions:
-                if permission.resource == 'admin' or permission.name == 'system.admin':
-                    has_admin_permission = True
-                    break
-            if has_admin_permission:
-                break
+        if has_admin_permission is None:
+            return jsonify({'message': 'User not found'}), 404
         
         if not has_admin_permission:
             return jsonify({'message': 'Admin access required'}), 403
@@ -40,90 +153,72 @@ def admin_required(f):
 def get_property_types():
     """Get all property types"""
     try:
-        include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
+        include_inactive = request.args.get('include_inactive', '').lower() in _TRUE_SET
         
-        if include_inactive:
-            property_types = PropertyType.query.order_by(PropertyType.name).all()
-        else:
-            property_types = PropertyType.get_active_types()
+        # Plain rows with a grouped property count; no ORM objects for a read-only list
+        property_types = PropertyType.list_dicts(include_inactive)
         
         return jsonify({
             'success': True,
-            'data': [pt.to_dict() for pt in property_types],
+            'data': property_types,
             'total': len(property_types)
         })
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property types: {str(e)}'
-        }), 500
+        return _error(f'Error fetching property types: {str(e)}', 500)
 
 @admin_bp.route('/property-types', methods=['POST'])
 @admin_required
 def create_property_type():
     """Create a new property type"""
     try:
-        data = request.get_json()
+        data = _decode_body(PropertyTypeIn)
         
         if not data:
-            return jsonify({
-                'success': False,
-                'message': 'No data provided'
-            }), 400
+            return _error('No data provided', 400)
         
-        name = data.get('name', '').strip()
-        description = data.get('description', '').strip()
-        is_active = data.get('is_active', True)
+        name = data.name
         
         if not name:
-            return jsonify({
-                'success': False,
-                'message': 'Property type name is required'
-            }), 400
+            return _error('Property type name is required', 400)
         
         # Check if property type already exists
-        existing_type = PropertyType.get_by_name(name)
-        if existing_type:
-            return jsonify({
-                'success': False,
-                'message': f'Property type "{name}" already exists'
-            }), 409
+        if _name_exists(PropertyType, name):
+            return _error(f'Property type "{name}" already exists', 409)
         
         # Create new property type
         property_type = PropertyType(
             name=name,
-            description=description if description else None,
-            is_active=is_active
+            description=data.description or None,
+            is_active=data.is_active
         )
         
         db.session.add(property_type)
+        db.session.flush()
+        payload = property_type.to_dict()
         db.session.commit()
+        response_cache.bump('property_types')
         
         return jsonify({
             'success': True,
             'message': 'Property type created successfully',
-            'data': property_type.to_dict()
+            'data': payload
         }), 201
         
+    except ValueError as e:
+        return _error(str(e), 400)
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error creating property type: {str(e)}'
-        }), 500
+        return _error(f'Error creating property type: {str(e)}', 500)
 
 @admin_bp.route('/property-types/<int:type_id>', methods=['GET'])
 @admin_required
 def get_property_type(type_id):
     """Get a specific property type"""
     try:
-        property_type = PropertyType.query.get(type_id)
+        property_type = db.session.get(PropertyType, type_id)
         
         if not property_type:
-            return jsonify({
-                'success': False,
-                'message': 'Property type not found'
-            }), 404
+            return _error('Property type not found', 404)
         
         return jsonify({
             'success': True,
@@ -131,92 +226,80 @@ def get_property_type(type_id):
         })
         
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property type: {str(e)}'
-        }), 500
+        return _error(f'Error fetching property type: {str(e)}', 500)
 
 @admin_bp.route('/property-types/<int:type_id>', methods=['PUT'])
 @admin_required
 def update_property_type(type_id):
     """Update a property type"""
     try:
-        property_type = PropertyType.query.get(type_id)
+        property_type = db.session.get(PropertyType, type_id)
         
         if not property_type:
-            return jsonify({
-                'success': False,
-                'message': 'Property type not found'
-            }), 404
+            return _error('Property type not found', 404)
         
-        data = request.get_json()
+        data = _decode_body(PropertyTypeIn)
         if not data:
-            return jsonify({
-                'success': False,
-                'message': 'No data provided'
-            }), 400
+            return _error('No data provided', 400)
         
         # Check if name is being changed and if it conflicts
-        new_name = data.get('name', '').strip()
+        new_name = data.name
         if new_name and new_name != property_type.name:
-            existing_type = PropertyType.get_by_name(new_name)
-            if existing_type:
-                return jsonify({
-                    'success': False,
-                    'message': f'Property type "{new_name}" already exists'
-                }), 409
+            if _name_exists(PropertyType, new_name):
+                return _error(f'Property type "{new_name}" already exists', 409)
         
         # Update property type
         update_data = {}
         if new_name:
             update_data['name'] = new_name
-        if 'description' in data:
-            update_data['description'] = data['description'].strip() if data['description'] else None
-        if 'is_active' in data:
-            update_data['is_active'] = data['is_active']
+        if 'description' in data.provided:
+            update_data['description'] = data.description or None
+        if 'is_active' in data.provided:
+            update_data['is_active'] = data.is_active
         
         property_type.update(**update_data)
+        db.session.flush()
+        payload = property_type.to_dict()
         db.session.commit()
+        response_cache.bump('property_types')
+        # Property list rows embed the type name
+        response_cache.bump('properties')
         
         return jsonify({
             'success': True,
             'message': 'Property type updated successfully',
-            'data': property_type.to_dict()
+            'data': payload
         })
         
+    except ValueError as e:
+        return _error(str(e), 400)
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error updating property type: {str(e)}'
-        }), 500
+        return _error(f'Error updating property type: {str(e)}', 500)
 
 @admin_bp.route('/property-types/<int:type_id>', methods=['DELETE'])
 @admin_required
 def delete_property_type(type_id):
     """Delete a property type (soft delete by setting inactive)"""
     try:
-        property_type = PropertyType.query.get(type_id)
+        property_type = db.session.get(PropertyType, type_id, options=[raiseload('*')])
         
         if not property_type:
-            return jsonify({
-                'success': False,
-                'message': 'Property type not found'
-            }), 404
+            return _error('Property type not found', 404)
         
         # Check if property type is being used by any properties
-        if property_type.properties:
-            active_properties = [p for p in property_type.properties]
-            if active_properties:
-                return jsonify({
-                    'success': False,
-                    'message': f'Cannot delete property type. It is currently used by {len(active_properties)} properties.',
-                    'property_count': len(active_properties)
-                }), 409
+        property_count = db.session.query(func.count(Property.id)).filter_by(property_type_id=type_id).scalar()
+        if property_count > 0:
+            return jsonify({
+                'success': False,
+                'message': f'Cannot delete property type. It is currently used by {property_count} properties.',
+                'property_count': property_count
+            }), 409
         
         # Soft delete by setting inactive
         property_type.update(is_active=False)
         db.session.commit()
+        response_cache.bump('property_types')
         
         return jsonify({
             'success': True,
@@ -225,145 +308,113 @@ def delete_property_type(type_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error deleting property type: {str(e)}'
-        }), 500
+        return _error(f'Error deleting property type: {str(e)}', 500)
 
 @admin_bp.route('/property-types/<int:type_id>/toggle-status', methods=['PATCH'])
 @admin_required
 def toggle_property_type_status(type_id):
     """Toggle property type active status"""
     try:
-        property_type = PropertyType.query.get(type_id)
+        # Toggle status in one UPDATE ... RETURNING (no prior SELECT)
+        data = _toggle_active(PropertyType, type_id, Property.property_type_id)
         
-        if not property_type:
-            return jsonify({
-                'success': False,
-                'message': 'Property type not found'
-            }), 404
+        if data is None:
+            return _error('Property type not found', 404)
         
-        # Toggle status
-        property_type.update(is_active=not property_type.is_active)
         db.session.commit()
+        response_cache.bump('property_types')
         
-        status = 'activated' if property_type.is_active else 'deactivated'
+        status = 'activated' if data['is_active'] else 'deactivated'
         
         return jsonify({
             'success': True,
             'message': f'Property type {status} successfully',
-            'data': property_type.to_dict()
+            'data': data
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error toggling property type status: {str(e)}'
-        }), 500
+        return _error(f'Error toggling property type status: {str(e)}', 500)
 
 
 # Property Status Management Routes
-from src.models.property_status_model import PropertyStatus
-
 @admin_bp.route('/property-statuses', methods=['GET'])
 @admin_required
 def get_property_statuses():
     """Get all property statuses"""
     try:
-        include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
+        include_inactive = request.args.get('include_inactive', '').lower() in _TRUE_SET
         
-        if include_inactive:
-            property_statuses = PropertyStatus.query.order_by(PropertyStatus.name).all()
-        else:
-            property_statuses = PropertyStatus.get_active_statuses()
+        # Plain rows with a grouped property count; no ORM objects for a read-only list
+        property_statuses = PropertyStatus.list_dicts(include_inactive)
         
         return jsonify({
             'success': True,
-            'data': [ps.to_dict() for ps in property_statuses],
+            'data': property_statuses,
             'total': len(property_statuses)
         })
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property statuses: {str(e)}'
-        }), 500
+        return _error(f'Error fetching property statuses: {str(e)}', 500)
 
 @admin_bp.route('/property-statuses', methods=['POST'])
 @admin_required
 def create_property_status():
     """Create a new property status"""
     try:
-        data = request.get_json()
+        data = _decode_body(PropertyStatusIn)
         
         if not data:
-            return jsonify({
-                'success': False,
-                'message': 'No data provided'
-            }), 400
+            return _error('No data provided', 400)
         
-        name = data.get('name', '').strip()
-        color = data.get('color', '#3B82F6').strip()
-        description = data.get('description', '').strip()
-        is_active = data.get('is_active', True)
+        name = data.name
+        color = _validate_color(data.color if 'color' in data.provided else '#3B82F6')
         
         if not name:
-            return jsonify({
-                'success': False,
-                'message': 'Property status name is required'
-            }), 400
+            return _error('Property status name is required', 400)
         
         # Validate color format (hex color)
-        if not color.startswith('#') or len(color) != 7:
-            return jsonify({
-                'success': False,
-                'message': 'Color must be a valid hex color code (e.g., #3B82F6)'
-            }), 400
+        if not color:
+            return _error('Color must be a valid hex color code (e.g., #3B82F6)', 400)
         
         # Check if property status already exists
-        existing_status = PropertyStatus.get_by_name(name)
-        if existing_status:
-            return jsonify({
-                'success': False,
-                'message': f'Property status "{name}" already exists'
-            }), 409
+        if _name_exists(PropertyStatus, name):
+            return _error(f'Property status "{name}" already exists', 409)
         
         # Create new property status
         property_status = PropertyStatus(
             name=name,
             color=color,
-            description=description if description else None,
-            is_active=is_active
+            description=data.description or None,
+            is_active=data.is_active
         )
         
         db.session.add(property_status)
+        db.session.flush()
+        payload = property_status.to_dict()
         db.session.commit()
+        response_cache.bump('property_statuses')
         
         return jsonify({
             'success': True,
             'message': 'Property status created successfully',
-            'data': property_status.to_dict()
+            'data': payload
         }), 201
         
+    except ValueError as e:
+        return _error(str(e), 400)
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error creating property status: {str(e)}'
-        }), 500
+        return _error(f'Error creating property status: {str(e)}', 500)
 
 @admin_bp.route('/property-statuses/<int:status_id>', methods=['GET'])
 @admin_required
 def get_property_status(status_id):
     """Get a specific property status"""
     try:
-        property_status = PropertyStatus.query.get(status_id)
+        property_status = db.session.get(PropertyStatus, status_id)
         
         if not property_status:
-            return jsonify({
-                'success': False,
-                'message': 'Property status not found'
-            }), 404
+            return _error('Property status not found', 404)
         
         return jsonify({
             'success': True,
@@ -371,48 +422,32 @@ def get_property_status(status_id):
         })
         
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property status: {str(e)}'
-        }), 500
+        return _error(f'Error fetching property status: {str(e)}', 500)
 
 @admin_bp.route('/property-statuses/<int:status_id>', methods=['PUT'])
 @admin_required
 def update_property_status(status_id):
     """Update a property status"""
     try:
-        property_status = PropertyStatus.query.get(status_id)
+        property_status = db.session.get(PropertyStatus, status_id)
         
         if not property_status:
-            return jsonify({
-                'success': False,
-                'message': 'Property status not found'
-            }), 404
+            return _error('Property status not found', 404)
         
-        data = request.get_json()
+        data = _decode_body(PropertyStatusIn)
         if not data:
-            return jsonify({
-                'success': False,
-                'message': 'No data provided'
-            }), 400
+            return _error('No data provided', 400)
         
         # Check if name is being changed and if it conflicts
-        new_name = data.get('name', '').strip()
+        new_name = data.name
         if new_name and new_name != property_status.name:
-            existing_status = PropertyStatus.get_by_name(new_name)
-            if existing_status:
-                return jsonify({
-                    'success': False,
-                    'message': f'Property status "{new_name}" already exists'
-                }), 409
+            if _name_exists(PropertyStatus, new_name):
+                return _error(f'Property status "{new_name}" already exists', 409)
         
         # Validate color if provided
-        new_color = data.get('color', '').strip()
-        if new_color and (not new_color.startswith('#') or len(new_color) != 7):
-            return jsonify({
-                'success': False,
-                'message': 'Color must be a valid hex color code (e.g., #3B82F6)'
-            }), 400
+        new_color = data.color
+        if new_color and not _validate_color(new_color):
+            return _error('Color must be a valid hex color code (e.g., #3B82F6)', 400)
         
         # Update property status
         update_data = {}
@@ -420,53 +455,54 @@ def update_property_status(status_id):
             update_data['name'] = new_name
         if new_color:
             update_data['color'] = new_color
-        if 'description' in data:
-            update_data['description'] = data['description'].strip() if data['description'] else None
-        if 'is_active' in data:
-            update_data['is_active'] = data['is_active']
+        if 'description' in data.provided:
+            update_data['description'] = data.description or None
+        if 'is_active' in data.provided:
+            update_data['is_active'] = data.is_active
         
         property_status.update(**update_data)
+        db.session.flush()
+        payload = property_status.to_dict()
         db.session.commit()
+        response_cache.bump('property_statuses')
+        # Property list rows embed the status name and color
+        response_cache.bump('properties')
         
         return jsonify({
             'success': True,
             'message': 'Property status updated successfully',
-            'data': property_status.to_dict()
+            'data': payload
         })
         
+    except ValueError as e:
+        return _error(str(e), 400)
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error updating property status: {str(e)}'
-        }), 500
+        return _error(f'Error updating property status: {str(e)}', 500)
 
 @admin_bp.route('/property-statuses/<int:status_id>', methods=['DELETE'])
 @admin_required
 def delete_property_status(status_id):
     """Delete a property status (soft delete by setting inactive)"""
     try:
-        property_status = PropertyStatus.query.get(status_id)
+        property_status = db.session.get(PropertyStatus, status_id, options=[raiseload('*')])
         
         if not property_status:
-            return jsonify({
-                'success': False,
-                'message': 'Property status not found'
-            }), 404
+            return _error('Property status not found', 404)
         
         # Check if property status is being used by any properties
-        if property_status.properties:
-            active_properties = [p for p in property_status.properties]
-            if active_properties:
-                return jsonify({
-                    'success': False,
-                    'message': f'Cannot delete property status. It is currently used by {len(active_properties)} properties.',
-                    'property_count': len(active_properties)
-                }), 409
+        property_count = db.session.query(func.count(Property.id)).filter_by(property_status_id=status_id).scalar()
+        if property_count > 0:
+            return jsonify({
+                'success': False,
+                'message': f'Cannot delete property status. It is currently used by {property_count} properties.',
+                'property_count': property_count
+            }), 409
         
         # Soft delete by setting inactive
         property_status.update(is_active=False)
         db.session.commit()
+        response_cache.bump('property_statuses')
         
         return jsonify({
             'success': True,
@@ -475,66 +511,83 @@ def delete_property_status(status_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error deleting property status: {str(e)}'
-        }), 500
+        return _error(f'Error deleting property status: {str(e)}', 500)
 
 @admin_bp.route('/property-statuses/<int:status_id>/toggle-status', methods=['PATCH'])
 @admin_required
 def toggle_property_status_status(status_id):
     """Toggle property status active status"""
     try:
-        property_status = PropertyStatus.query.get(status_id)
+        # Toggle status in one UPDATE ... RETURNING (no prior SELECT)
+        data = _toggle_active(PropertyStatus, status_id, Property.property_status_id)
         
-        if not property_status:
-            return jsonify({
-                'success': False,
-                'message': 'Property status not found'
-            }), 404
+        if data is None:
+            return _error('Property status not found', 404)
         
-        # Toggle status
-        property_status.update(is_active=not property_status.is_active)
         db.session.commit()
+        response_cache.bump('property_statuses')
         
-        status = 'activated' if property_status.is_active else 'deactivated'
+        status = 'activated' if data['is_active'] else 'deactivated'
         
         return jsonify({
             'success': True,
             'message': f'Property status {status} successfully',
-            'data': property_status.to_dict()
+            'data': data
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error toggling property status: {str(e)}'
-        }), 500
+        return _error(f'Error toggling property status: {str(e)}', 500)
 
 # Admin Dashboard Statistics Route
+# Dashboard statement, built once at import: every status with its property count (as in
+# Property.get_statistics) and every active type with its count, in one UNION ALL round trip.
+# The active status total rides on each row as a scalar subquery; with no rows at all there
+# are no statuses, so it is 0
+_ACTIVE_STATUS_COUNT = (
+    select(func.count(PropertyStatus.id)).where(PropertyStatus.is_active == True).scalar_subquery()
+)
+_DASHBOARD_COUNTS = union_all(
+    select(
+        literal('status').label('kind'),
+        PropertyStatus.id.label('id'),
+        PropertyStatus.name.label('name'),
+        PropertyStatus.color.label('color'),
+        func.count(Property.id).label('count'),
+        _ACTIVE_STATUS_COUNT.label('active_statuses')
+    )
+    .outerjoin(Property, PropertyStatus.id == Property.property_status_id)
+    .group_by(PropertyStatus.id, PropertyStatus.name, PropertyStatus.color),
+    select(
+        literal('type'),
+        PropertyType.id,
+        PropertyType.name,
+        null(),
+        func.count(Property.id),
+        _ACTIVE_STATUS_COUNT
+    )
+    .outerjoin(Property, PropertyType.id == Property.property_type_id)
+    .where(PropertyType.is_active == True)
+    .group_by(PropertyType.id, PropertyType.name)
+).subquery()
+_STMT_DASHBOARD_COUNTS = select(_DASHBOARD_COUNTS).order_by(_DASHBOARD_COUNTS.c.kind, _DASHBOARD_COUNTS.c.id)
+
 @admin_bp.route('/dashboard/statistics', methods=['GET'])
 @admin_required
 def get_admin_dashboard_statistics():
     """Get statistics for admin dashboard"""
     try:
-        from src.models.property_model import Property
+        rows = db.session.execute(_STMT_DASHBOARD_COUNTS).all()
+        property_type_counts = [row for row in rows if row.kind == 'type']
         
         # Get property statistics
-        property_stats = Property.get_statistics()
-        
-        # Get property type counts
-        property_type_counts = db.session.query(
-            PropertyType.name,
-            db.func.count(Property.id).label('count')
-        ).outerjoin(Property, PropertyType.id == Property.property_type_id)\
-         .filter(PropertyType.is_active == True)\
-         .group_by(PropertyType.id, PropertyType.name)\
-         .all()
+        property_stats = Property.statistics_from_rows(
+            [(row.name, row.color, row.count) for row in rows if row.kind == 'status']
+        )
         
-        # Get active counts
-        active_property_types = PropertyType.query.filter_by(is_active=True).count()
-        active_property_statuses = PropertyStatus.query.filter_by(is_active=True).count()
+        # Get active counts (one row per active type)
+        active_property_types = len(property_type_counts)
+        active_property_statuses = rows[0].active_statuses if rows else 0
         
         return jsonify({
             'success': True,
@@ -558,8 +611,5 @@ def get_admin_dashboard_statistics():
         })
         
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching dashboard statistics: {str(e)}'
-        }), 500
+        return _error(f'Error fetching dashboard statistics: {str(e)}', 500)
 
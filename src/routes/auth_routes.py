@@ -1,17 +1,50 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, g
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, jwt_required,
-    get_jwt_identity, get_jwt, verify_jwt_in_request
+    get_jwt_identity, verify_jwt_in_request
 )
-from werkzeug.security import check_password_hash
+from src.utils.password_hashing import check_password_hash, generate_password_hash
 from datetime import datetime, timedelta
+from functools import lru_cache
+from sqlalchemy import select, update, bindparam, or_
+from sqlalchemy.orm import selectinload, lazyload
 import uuid
 
 from src.models.user import db
-from src.models.user_model import User, Role, Permission
+from src.models.user_model import User, Role, Permission, password_hash_method
+from src.utils import background, permission_cache
 
 auth_bp = Blueprint('auth', __name__)
 
+# Roles and their permissions in two IN queries, for handlers that read permissions
+# (the relationships' own subquery loading re-runs the user lookup for each level)
+USER_PERMISSIONS_LOAD = selectinload(User.roles).selectinload(Role.permissions)
+
+# Roles only; their permission names come from permission_cache's per-role cache
+USER_ROLES_LOAD = selectinload(User.roles).lazyload(Role.permissions)
+
+# Username-or-email login lookup, built once; both columns have unique indexes,
+# so PostgreSQL combines two index scans (BitmapOr) for the OR
+_LOGIN_STMT = (
+    select(User)
+    .where(or_(User.username == bindparam('login'), User.email == bindparam('login')))
+    .options(USER_ROLES_LOAD)
+    .limit(1)
+)
+
+# last_login granularity: a login this soon after the recorded one skips the write
+LAST_LOGIN_RESOLUTION = timedelta(seconds=60)
+
+def _record_last_login(user_id, logged_in_at):
+    """Store a user's login time (runs on the background write queue)"""
+    db.session.execute(update(User).where(User.id == user_id).values(last_login=logged_in_at))
+    db.session.commit()
+
+@lru_cache(maxsize=4)
+def _dummy_password_hash(method):
+    """Hash checked for unknown usernames, so they take as long as a wrong password"""
+    return generate_password_hash(uuid.uuid4().hex, method=method)
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
@@ -29,23 +62,37 @@ def login():
             return jsonify({'message': 'Username and password are required'}), 400
         
         # Find user by username or email
-        user = User.query.filter(
-            (User.username == username) | (User.email == username)
-        ).first()
+        user = db.session.execute(_LOGIN_STMT, {'login': username}).scalars().first()
         
         if not user:
+            # Spend the same hashing work as a wrong password so response time
+            # does not reveal which usernames exist
+            check_password_hash(_dummy_password_hash(password_hash_method()), password)
+            return jsonify({'message': 'Invalid credentials'}), 401
+        
+        # Verify password (before the active check, which would otherwise confirm
+        # the account exists without any hashing)
+        if not user.check_password(password):
             return jsonify({'message': 'Invalid credentials'}), 401
         
         # Check if account is active
         if not user.is_active:
             return jsonify({'message': 'Account is deactivated'}), 403
         
-        # Verify password
-        if not user.check_password(password):
-            return jsonify({'message': 'Invalid credentials'}), 401
+        # Upgrade hashes made before PASSWORD_HASH_METHOD changed (the only place the
+        # plain password is available)
+        if user.password_needs_rehash():
+            user.rehash_password(password)
+            db.session.commit()
+        
+        # Record the login time off the request thread; repeat logins within
+        # LAST_LOGIN_RESOLUTION of the recorded one are not written again
+        now = datetime.utcnow()
+        if user.last_login is None or now - user.last_login >= LAST_LOGIN_RESOLUTION:
+            background.submit(_record_last_login, user.id, now)
         
-        # Update last login
-        user.last_login = datetime.utcnow()
+        # Get user permissions from roles
+        permissions = permission_cache.get_roles_permission_set(user.roles)
         
         # Create tokens
         access_token = create_access_token(
@@ -54,10 +101,7 @@ def login():
         )
         refresh_token = create_refresh_token(identity=str(user.id))
         
-        db.session.commit()
-        
-        # Get user permissions from roles
-        user_permissions = user.get_permissions()
+        user_permissions = list(permissions.names)
         
         # Return user info and tokens
         return jsonify({
@@ -96,24 +140,13 @@ def logout():
 def get_profile():
     """Get current user profile"""
     try:
-        current_user_id = get_jwt_identity()
-        
-        # Convert string UUID to UUID object if needed
-        if isinstance(current_user_id, str):
-            import uuid
-            current_user_id = uuid.UUID(current_user_id)
-        
-        user = User.query.get(current_user_id)
+        user = User.query.options(USER_ROLES_LOAD).get(get_current_user_id())
         
         if not user:
             return jsonify({'message': 'User not found'}), 404
         
         # Get user permissions from roles
-        user_permissions = []
-        for role in user.roles:
-            for permission in role.permissions:
-                if permission.name not in user_permissions:
-                    user_permissions.append(permission.name)
+        user_permissions = list(permission_cache.get_roles_permission_set(user.roles).names)
         
         return jsonify({
             'user': {
@@ -139,8 +172,7 @@ def get_profile():
 def refresh():
     """Refresh access token"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = User.query.options(lazyload(User.roles)).get(uuid.UUID(get_jwt_identity()))
         
         if not user or not user.is_active:
             return jsonify({'message': 'User not found or inactive'}), 404
@@ -154,47 +186,57 @@ def refresh():
     except Exception as e:
         return jsonify({'message': f'Token refresh failed: {str(e)}'}), 500
 
+# Health body around its timestamp, laid out like the app's JSON provider output
+# (sorted keys, trailing newline); only the timestamp changes per request
+_HEALTH_BODY_PREFIX = b'{"service":"Authentication Service","status":"healthy","timestamp":"'
+_HEALTH_BODY_SUFFIX = b'"}\n'
+
 @auth_bp.route('/health', methods=['GET'])
 def auth_health():
     """Authentication service health check"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Authentication Service',
-        'timestamp': datetime.utcnow().isoformat()
-    }), 200
+    body = _HEALTH_BODY_PREFIX + datetime.utcnow().isoformat().encode() + _HEALTH_BODY_SUFFIX
+    return Response(body, mimetype='application/json')
 
 
 # Helper functions for permission checking
 from functools import wraps
 
 def get_current_user():
-    """Get current authenticated user"""
+    """Get current authenticated user (loaded once per request and kept on g)"""
     try:
-        verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        
-        if isinstance(current_user_id, str):
-            import uuid
-            current_user_id = uuid.UUID(current_user_id)
+        current_user_id = get_current_user_id()
         
-        user = User.query.get(current_user_id)
-        return user
+        if '_current_user' not in g:
+            g._current_user = User.query.options(USER_PERMISSIONS_LOAD).get(current_user_id)
+        return g._current_user
     except:
         return None
 
+def get_current_user_id():
+    """UUID of the authenticated user, parsed once per request from the token identity (no database lookup)"""
+    verify_jwt_in_request()
+    if '_current_user_id' not in g:
+        g._current_user_id = uuid.UUID(get_jwt_identity())
+    return g._current_user_id
+
+def jwt_has_role(role_name):
+    """Check the current user's role (case-insensitive) from the permission cache, without loading the user"""
+    roles = permission_cache.get_user_role_names(get_current_user_id())
+    return bool(roles) and role_name.lower() in roles
+
 def require_permission(permission_name):
     """Decorator to require specific permission"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
-                verify_jwt_in_request()
-                current_user = get_current_user()
+                # Cached permission names, invalidated on role and permission changes
+                permissions = permission_cache.get_user_permission_set(get_current_user_id())
                 
-                if not current_user:
+                if permissions is None:
                     return jsonify({'error': 'Authentication required'}), 401
                 
-                if not current_user.has_permission(permission_name):
+                if permission_name not in permissions.names:
                     return jsonify({
                         'error': f'Permission {permission_name} required',
                         'code': 'PERMISSION_DENIED'
@@ -1,37 +1,80 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, g
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import NoAuthorizationError
 from src.models.user import db
 from src.models.property_model import Property
 from src.models.property_type_model import PropertyType
 from src.models.property_status_model import PropertyStatus
-from src.models.user_model import User
+from src.utils import permission_cache, response_cache
 from functools import wraps
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, bindparam, delete, func, literal, select, tuple_, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import InternalServerError
+from datetime import datetime
+import base64
+import math
+import uuid
 
 property_bp = Blueprint('property', __name__)
 
+@property_bp.errorhandler(SQLAlchemyError)
+def handle_database_error(e):
+    """Roll back and return a generic JSON 500 for database errors in property routes"""
+    db.session.rollback()
+    current_app.logger.error(f"Property route database error: {str(e)}")
+    return jsonify({
+        'success': False,
+        'message': 'Database error'
+    }), 500
+
+@property_bp.errorhandler(InternalServerError)
+def handle_internal_error(e):
+    """Generic JSON 500 for any other unhandled exception in property routes"""
+    db.session.rollback()
+    return jsonify({
+        'success': False,
+        'message': 'Internal server error'
+    }), 500
+
+# Permission actions that grant property writes
+PROPERTY_WRITE_ACTIONS = ('create', 'update', 'delete')
+
+@property_bp.before_request
+def load_jwt_identity():
+    """Verify the JWT once per request; property decorators read the identity from g"""
+    verify_jwt_in_request(optional=True)
+    g.jwt_identity = get_jwt_identity()
+
+def _current_permissions():
+    """Permission set of the JWT user, resolved once per request and shared by stacked decorators"""
+    if '_auth_perms' not in g:
+        user_id = g.get('jwt_identity')
+        if user_id is None:
+            # Handled by the app's JWT unauthorized loader (401)
+            raise NoAuthorizationError('Missing Authorization Header')
+        if isinstance(user_id, str):
+            user_id = uuid.UUID(user_id)
+        g._auth_perms = permission_cache.get_user_permission_set(user_id)
+    return g._auth_perms
+
+def _user_has_perm(permissions, resource='properties', actions=None):
+    """Whether a permission set grants system.admin or access to resource (limited to actions when given)"""
+    if 'system.admin' in permissions.names:
+        return True
+    if actions is None:
+        return resource in permissions.resources
+    return any((resource, action) in permissions.pairs for action in actions)
+
 def property_access_required(f):
     """Decorator to require property access permissions"""
     @wraps(f)
-    @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        permissions = _current_permissions()
         
-        if not user:
+        if permissions is None:
             return jsonify({'message': 'User not found'}), 404
         
-        # Check if user has property permissions
-        has_property_permission = False
-        for role in user.roles:
-            for permission in role.permissions:
-                if permission.resource == 'properties' or permission.name == 'system.admin':
-                    has_property_permission = True
-                    break
-            if has_property_permission:
-                break
-        
-        if not has_property_permission:
+        if not _user_has_perm(permissions):
             return jsonify({'message': 'Property access required'}), 403
         
         return f(*args, **kwargs)
@@ -40,444 +83,449 @@ def property_access_required(f):
 def property_write_required(f):
     """Decorator to require property write permissions"""
     @wraps(f)
-    @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        permissions = _current_permissions()
         
-        if not user:
+        if permissions is None:
             return jsonify({'message': 'User not found'}), 404
         
-        # Check if user has property write permissions
-        has_write_permission = False
-        for role in user.roles:
-            for permission in role.permissions:
-                if (permission.resource == 'properties' and permission.action in ['create', 'update', 'delete']) or permission.name == 'system.admin':
-                    has_write_permission = True
-                    break
-            if has_write_permission:
-                break
-        
-        if not has_write_permission:
+        if not _user_has_perm(permissions, actions=PROPERTY_WRITE_ACTIONS):
             return jsonify({'message': 'Property write access required'}), 403
         
         return f(*args, **kwargs)
     return decorated_function
 
+def _encode_cursor(row):
+    """Opaque keyset cursor for the rows after row: base64("created_at|id")"""
+    raw = f'{row["created_at"].isoformat()}|{row["id"]}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor):
+    """(created_at, id) from a cursor, or None if it is malformed"""
+    try:
+        created_at, prop_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(prop_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+# Hot lookups built once at import so their compiled SQL is reused across requests
+_ACTIVE_LOOKUPS = union_all(
+    select(literal('type')).where(PropertyType.id == bindparam('type_id'), PropertyType.is_active == True),
+    select(literal('status')).where(PropertyStatus.id == bindparam('status_id'), PropertyStatus.is_active == True)
+)
+
+def _active_lookups(property_type_id=None, property_status_id=None):
+    """Which of the given type/status ids are active ({'type', 'status'} subset), checked in one query"""
+    if not property_type_id and not property_status_id:
+        return set()
+    
+    # A missing id binds NULL, which matches no row
+    return set(db.session.execute(_ACTIVE_LOOKUPS, {
+        'type_id': property_type_id or None,
+        'status_id': property_status_id or None
+    }).scalars())
+
+# Statistics share the 'properties' namespace, so property writes invalidate them too
+STATISTICS_CACHE_TTL = 60
+
+# Dropdown lookups change rarely; writes from the admin routes invalidate them
+DROPDOWN_CACHE_TTL = 300
+DROPDOWN_MAX_AGE = 60
+
 # Property CRUD Routes
 @property_bp.route('/properties', methods=['GET'])
 @property_access_required
+@response_cache.cached_response('properties')
 def get_properties():
     """Get all properties with filtering and pagination"""
-    try:
-        # Get query parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)  # Max 100 per page
-        search = request.args.get('search', '').strip()
-        property_type_id = request.args.get('type_id', type=int)
-        property_status_id = request.args.get('status_id', type=int)
-        sort_by = request.args.get('sort_by', 'created_at')
-        sort_order = request.args.get('sort_order', 'desc')
-        
-        # Build query
-        query = Property.query
-        
-        # Apply filters
-        if search:
-            query = query.filter(Property.address.contains(search))
-        
-        if property_type_id:
-            query = query.filter(Property.property_type_id == property_type_id)
-        
-        if property_status_id:
-            query = query.filter(Property.property_status_id == property_status_id)
-        
-        # Apply sorting
-        if sort_by == 'address':
-            order_column = Property.address
-        elif sort_by == 'created_at':
-            order_column = Property.created_at
-        elif sort_by == 'updated_at':
-            order_column = Property.updated_at
-        else:
-            order_column = Property.created_at
-        
-        if sort_order == 'asc':
-            query = query.order_by(order_column.asc())
-        else:
-            query = query.order_by(order_column.desc())
-        
-        # Execute pagination
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+    # Get query parameters
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 20, type=int), 100)  # Max 100 per page
+    search = request.args.get('search', '').strip()
+    property_type_id = request.args.get('type_id', type=int)
+    property_status_id = request.args.get('status_id', type=int)
+    sort_by = request.args.get('sort_by', 'created_at')
+    sort_order = request.args.get('sort_order', 'desc')
+    cursor = request.args.get('cursor')
+    
+    # Build a Core select of the list columns; rows are never hydrated into ORM objects
+    query = Property.select_simple()
+    
+    # Apply filters
+    if search:
+        query = query.where(Property.address_contains(search))
+    
+    if property_type_id:
+        query = query.where(Property.property_type_id == property_type_id)
+    
+    if property_status_id:
+        query = query.where(Property.property_status_id == property_status_id)
+    
+    # Apply sorting
+    if sort_by == 'address':
+        order_column = Property.address
+    elif sort_by == 'created_at':
+        order_column = Property.created_at
+    elif sort_by == 'updated_at':
+        order_column = Property.updated_at
+    else:
+        order_column = Property.created_at
+    
+    if sort_order == 'asc':
+        query = query.order_by(order_column.asc())
+    else:
+        query = query.order_by(order_column.desc())
+    
+    # Out-of-range per_page falls back like paginate(error_out=False) on both paths
+    page_size = per_page if per_page > 0 else 20
+    
+    # Keyset pagination on (created_at, id): seek past the previous page, no COUNT(*)
+    if cursor is not None and order_column is Property.created_at:
+        descending = sort_order != 'asc'
+        
+        if cursor:
+            position = _decode_cursor(cursor)
+            if position is None:
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid cursor'
+                }), 400
+            
+            key = tuple_(Property.created_at, Property.id)
+            query = query.where(key < position if descending else key > position)
         
-        properties = pagination.items
+        rows = db.session.execute(
+            query.order_by(Property.id.desc() if descending else Property.id.asc())
+            .limit(page_size + 1)
+        ).mappings().all()
+        properties = rows[:page_size]
+        has_next = len(rows) > page_size
         
         return jsonify({
             'success': True,
-            'data': [prop.to_dict_simple() for prop in properties],
+            'data': Property.simple_dicts(properties),
             'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'per_page': page_size,
+                'has_next': has_next,
+                'next_cursor': _encode_cursor(properties[-1]) if has_next else None
             }
         })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching properties: {str(e)}'
-        }), 500
+    
+    # Execute pagination (out-of-range page falls back like paginate(error_out=False))
+    offset_page = max(page, 1)
+    total = db.session.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    ).scalar()
+    properties = db.session.execute(
+        query.limit(page_size).offset((offset_page - 1) * page_size)
+    ).mappings().all()
+    pages = math.ceil(total / page_size)
+    
+    return jsonify({
+        'success': True,
+        'data': Property.simple_dicts(properties),
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': pages,
+            'has_next': offset_page < pages,
+            'has_prev': offset_page > 1
+        }
+    })
 
 @property_bp.route('/properties/<int:property_id>', methods=['GET'])
 @property_access_required
 def get_property(property_id):
     """Get a specific property"""
-    try:
-        property_obj = Property.query.get(property_id)
-        
-        if not property_obj:
-            return jsonify({
-                'success': False,
-                'message': 'Property not found'
-            }), 404
-        
-        return jsonify({
-            'success': True,
-            'data': property_obj.to_dict()
-        })
-        
-    except Exception as e:
+    property_obj = db.session.get(Property, property_id)
+    
+    if not property_obj:
         return jsonify({
             'success': False,
-            'message': f'Error fetching property: {str(e)}'
-        }), 500
+            'message': 'Property not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': property_obj.to_dict()
+    })
 
 @property_bp.route('/properties', methods=['POST'])
 @property_write_required
 def create_property():
     """Create a new property"""
-    try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({
-                'success': False,
-                'message': 'No data provided'
-            }), 400
-        
-        # Validate required fields
-        address = data.get('address', '').strip()
-        property_type_id = data.get('property_type_id')
-        property_status_id = data.get('property_status_id')
-        
-        if not address:
-            return jsonify({
-                'success': False,
-                'message': 'Property address is required'
-            }), 400
-        
-        if not property_type_id:
-            return jsonify({
-                'success': False,
-                'message': 'Property type is required'
-            }), 400
-        
-        if not property_status_id:
-            return jsonify({
-                'success': False,
-                'message': 'Property status is required'
-            }), 400
-        
-        # Validate property type exists and is active
-        property_type = PropertyType.query.filter_by(id=property_type_id, is_active=True).first()
-        if not property_type:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid or inactive property type'
-            }), 400
-        
-        # Validate property status exists and is active
-        property_status = PropertyStatus.query.filter_by(id=property_status_id, is_active=True).first()
-        if not property_status:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid or inactive property status'
-            }), 400
-        
-        # Get optional fields
-        bedrooms = data.get('bedrooms')
-        bathrooms = data.get('bathrooms')
-        description = data.get('description', '').strip()
-        
-        # Validate numeric fields
-        if bedrooms is not None and (not isinstance(bedrooms, int) or bedrooms < 0):
-            return jsonify({
-                'success': False,
-                'message': 'Bedrooms must be a non-negative integer'
-            }), 400
-        
-        if bathrooms is not None and (not isinstance(bathrooms, int) or bathrooms < 0):
-            return jsonify({
-                'success': False,
-                'message': 'Bathrooms must be a non-negative integer'
-            }), 400
-        
-        # Create new property
-        property_obj = Property(
-            address=address,
-            property_type_id=property_type_id,
-            property_status_id=property_status_id,
-            bedrooms=bedrooms,
-            bathrooms=bathrooms,
-            description=description if description else None
-        )
-        
-        db.session.add(property_obj)
-        db.session.commit()
-        
+    data = request.get_json()
+    
+    if not data:
         return jsonify({
-            'success': True,
-            'message': 'Property created successfully',
-            'data': property_obj.to_dict()
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
+            'success': False,
+            'message': 'No data provided'
+        }), 400
+    
+    # Validate required fields
+    address = data.get('address', '').strip()
+    property_type_id = data.get('property_type_id')
+    property_status_id = data.get('property_status_id')
+    
+    if not address:
+        return jsonify({
+            'success': False,
+            'message': 'Property address is required'
+        }), 400
+    
+    if not property_type_id:
+        return jsonify({
+            'success': False,
+            'message': 'Property type is required'
+        }), 400
+    
+    if not property_status_id:
+        return jsonify({
+            'success': False,
+            'message': 'Property status is required'
+        }), 400
+    
+    # Validate property type and status exist and are active (one UNION ALL query)
+    active = _active_lookups(property_type_id, property_status_id)
+    if 'type' not in active:
         return jsonify({
             'success': False,
-            'message': f'Error creating property: {str(e)}'
-        }), 500
+            'message': 'Invalid or inactive property type'
+        }), 400
+    
+    if 'status' not in active:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid or inactive property status'
+        }), 400
+    
+    # Get optional fields
+    bedrooms = data.get('bedrooms')
+    bathrooms = data.get('bathrooms')
+    description = data.get('description', '').strip()
+    
+    # Validate numeric fields
+    if bedrooms is not None and (not isinstance(bedrooms, int) or bedrooms < 0):
+        return jsonify({
+            'success': False,
+            'message': 'Bedrooms must be a non-negative integer'
+        }), 400
+    
+    if bathrooms is not None and (not isinstance(bathrooms, int) or bathrooms < 0):
+        return jsonify({
+            'success': False,
+            'message': 'Bathrooms must be a non-negative integer'
+        }), 400
+    
+    # Create new property
+    property_obj = Property(
+        address=address,
+        property_type_id=property_type_id,
+        property_status_id=property_status_id,
+        bedrooms=bedrooms,
+        bathrooms=bathrooms,
+        description=description if description else None
+    )
+    
+    db.session.add(property_obj)
+    db.session.flush()
+    payload = property_obj.to_dict()
+    db.session.commit()
+    response_cache.bump('properties')
+    
+    return jsonify({
+        'success': True,
+        'message': 'Property created successfully',
+        'data': payload
+    }), 201
 
 @property_bp.route('/properties/<int:property_id>', methods=['PUT'])
 @property_write_required
 def update_property(property_id):
     """Update a property"""
-    try:
-        property_obj = Property.query.get(property_id)
-        
-        if not property_obj:
-            return jsonify({
-                'success': False,
-                'message': 'Property not found'
-            }), 404
-        
-        data = request.get_json()
-        if not data:
+    property_obj = db.session.get(Property, property_id)
+    
+    if not property_obj:
+        return jsonify({
+            'success': False,
+            'message': 'Property not found'
+        }), 404
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({
+            'success': False,
+            'message': 'No data provided'
+        }), 400
+    
+    # Validate and update fields
+    update_data = {}
+    
+    # Address
+    if 'address' in data:
+        address = data['address'].strip()
+        if not address:
             return jsonify({
                 'success': False,
-                'message': 'No data provided'
+                'message': 'Property address cannot be empty'
             }), 400
-        
-        # Validate and update fields
-        update_data = {}
-        
-        # Address
-        if 'address' in data:
-            address = data['address'].strip()
-            if not address:
-                return jsonify({
-                    'success': False,
-                    'message': 'Property address cannot be empty'
-                }), 400
-            update_data['address'] = address
-        
-        # Property type
-        if 'property_type_id' in data:
-            property_type_id = data['property_type_id']
-            if property_type_id:
-                property_type = PropertyType.query.filter_by(id=property_type_id, is_active=True).first()
-                if not property_type:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid or inactive property type'
-                    }), 400
-                update_data['property_type_id'] = property_type_id
-        
-        # Property status
-        if 'property_status_id' in data:
-            property_status_id = data['property_status_id']
-            if property_status_id:
-                property_status = PropertyStatus.query.filter_by(id=property_status_id, is_active=True).first()
-                if not property_status:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid or inactive property status'
-                    }), 400
-                update_data['property_status_id'] = property_status_id
-        
-        # Bedrooms
-        if 'bedrooms' in data:
-            bedrooms = data['bedrooms']
-            if bedrooms is not None and (not isinstance(bedrooms, int) or bedrooms < 0):
+        update_data['address'] = address
+    
+    # Check the new type and status (if any) in one round trip
+    active = _active_lookups(data.get('property_type_id'), data.get('property_status_id'))
+    
+    # Property type
+    if 'property_type_id' in data:
+        property_type_id = data['property_type_id']
+        if property_type_id:
+            if 'type' not in active:
                 return jsonify({
                     'success': False,
-                    'message': 'Bedrooms must be a non-negative integer'
+                    'message': 'Invalid or inactive property type'
                 }), 400
-            update_data['bedrooms'] = bedrooms
-        
-        # Bathrooms
-        if 'bathrooms' in data:
-            bathrooms = data['bathrooms']
-            if bathrooms is not None and (not isinstance(bathrooms, int) or bathrooms < 0):
+            update_data['property_type_id'] = property_type_id
+    
+    # Property status
+    if 'property_status_id' in data:
+        property_status_id = data['property_status_id']
+        if property_status_id:
+            if 'status' not in active:
                 return jsonify({
                     'success': False,
-                    'message': 'Bathrooms must be a non-negative integer'
+                    'message': 'Invalid or inactive property status'
                 }), 400
-            update_data['bathrooms'] = bathrooms
-        
-        # Description
-        if 'description' in data:
-            description = data['description'].strip() if data['description'] else None
-            update_data['description'] = description
-        
-        # Update property
-        property_obj.update(**update_data)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Property updated successfully',
-            'data': property_obj.to_dict()
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({
-            'success': False,
-            'message': f'Error updating property: {str(e)}'
-        }), 500
+            update_data['property_status_id'] = property_status_id
+    
+    # Bedrooms
+    if 'bedrooms' in data:
+        bedrooms = data['bedrooms']
+        if bedrooms is not None and (not isinstance(bedrooms, int) or bedrooms < 0):
+            return jsonify({
+                'success': False,
+                'message': 'Bedrooms must be a non-negative integer'
+            }), 400
+        update_data['bedrooms'] = bedrooms
+    
+    # Bathrooms
+    if 'bathrooms' in data:
+        bathrooms = data['bathrooms']
+        if bathrooms is not None and (not isinstance(bathrooms, int) or bathrooms < 0):
+            return jsonify({
+                'success': False,
+                'message': 'Bathrooms must be a non-negative integer'
+            }), 400
+        update_data['bathrooms'] = bathrooms
+    
+    # Description
+    if 'description' in data:
+        description = data['description'].strip() if data['description'] else None
+        update_data['description'] = description
+    
+    # Update property
+    property_obj.update(**update_data)
+    db.session.flush()
+    payload = property_obj.to_dict()
+    db.session.commit()
+    response_cache.bump('properties')
+    
+    return jsonify({
+        'success': True,
+        'message': 'Property updated successfully',
+        'data': payload
+    })
 
 @property_bp.route('/properties/<int:property_id>', methods=['DELETE'])
 @property_write_required
 def delete_property(property_id):
     """Delete a property"""
-    try:
-        property_obj = Property.query.get(property_id)
-        
-        if not property_obj:
-            return jsonify({
-                'success': False,
-                'message': 'Property not found'
-            }), 404
-        
-        # Store property info for response
-        property_address = property_obj.address
-        
-        # Delete property
-        db.session.delete(property_obj)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Property "{property_address}" deleted successfully'
-        })
-        
-    except Exception as e:
-        db.session.rollback()
+    # Delete and fetch the address for the response in one round trip
+    property_address = db.session.execute(
+        delete(Property)
+        .where(Property.id == property_id)
+        .returning(Property.address)
+    ).scalar_one_or_none()
+    
+    if property_address is None:
         return jsonify({
             'success': False,
-            'message': f'Error deleting property: {str(e)}'
-        }), 500
+            'message': 'Property not found'
+        }), 404
+    
+    db.session.commit()
+    response_cache.bump('properties')
+    
+    return jsonify({
+        'success': True,
+        'message': f'Property "{property_address}" deleted successfully'
+    })
 
 # Property Statistics and Dashboard Routes
 @property_bp.route('/properties/statistics', methods=['GET'])
 @property_access_required
+@response_cache.cached_response('properties', ttl=STATISTICS_CACHE_TTL)
 def get_property_statistics():
     """Get property statistics"""
-    try:
-        stats = Property.get_statistics()
-        
-        return jsonify({
-            'success': True,
-            'data': stats
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property statistics: {str(e)}'
-        }), 500
+    stats = Property.get_statistics()
+    
+    return jsonify({
+        'success': True,
+        'data': stats
+    })
 
 @property_bp.route('/properties/recent', methods=['GET'])
 @property_access_required
 def get_recent_properties():
     """Get recent properties for dashboard"""
-    try:
-        limit = min(request.args.get('limit', 10, type=int), 50)  # Max 50
-        
-        recent_properties = Property.query\
-            .order_by(Property.created_at.desc())\
-            .limit(limit)\
-            .all()
-        
-        return jsonify({
-            'success': True,
-            'data': [prop.to_dict_simple() for prop in recent_properties],
-            'total': len(recent_properties)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching recent properties: {str(e)}'
-        }), 500
+    limit = min(request.args.get('limit', 10, type=int), 50)  # Max 50
+    
+    recent_properties = db.session.execute(
+        Property.select_simple().order_by(Property.created_at.desc()).limit(limit)
+    ).mappings().all()
+    
+    return jsonify({
+        'success': True,
+        'data': Property.simple_dicts(recent_properties),
+        'total': len(recent_properties)
+    })
 
 # Property Types and Statuses for Dropdowns
 @property_bp.route('/property-types', methods=['GET'])
 @property_access_required
+@response_cache.cached_response('property_types', ttl=DROPDOWN_CACHE_TTL, max_age=DROPDOWN_MAX_AGE)
 def get_property_types_for_dropdown():
     """Get active property types for dropdown selection"""
-    try:
-        property_types = PropertyType.get_active_types()
-        
-        return jsonify({
-            'success': True,
-            'data': [
-                {
-                    'id': pt.id,
-                    'name': pt.name,
-                    'description': pt.description
-                }
-                for pt in property_types
-            ]
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property types: {str(e)}'
-        }), 500
+    property_types = PropertyType.get_active_types()
+    
+    return jsonify({
+        'success': True,
+        'data': [
+            {
+                'id': pt.id,
+                'name': pt.name,
+                'description': pt.description
+            }
+            for pt in property_types
+        ]
+    })
 
 @property_bp.route('/property-statuses', methods=['GET'])
 @property_access_required
+@response_cache.cached_response('property_statuses', ttl=DROPDOWN_CACHE_TTL, max_age=DROPDOWN_MAX_AGE)
 def get_property_statuses_for_dropdown():
     """Get active property statuses for dropdown selection"""
-    try:
-        property_statuses = PropertyStatus.get_active_statuses()
-        
-        return jsonify({
-            'success': True,
-            'data': [
-                {
-                    'id': ps.id,
-                    'name': ps.name,
-                    'color': ps.color,
-                    'description': ps.description
-                }
-                for ps in property_statuses
-            ]
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching property statuses: {str(e)}'
-        }), 500
+    property_statuses = PropertyStatus.get_active_statuses()
+    
+    return jsonify({
+        'success': True,
+        'data': [
+            {
+                'id': ps.id,
+                'name': ps.name,
+                'color': ps.color,
+                'description': ps.description
+            }
+            for ps in property_statuses
+        ]
+    })
 
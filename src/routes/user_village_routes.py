@@ -7,19 +7,45 @@ from flask import Blueprint, request, jsonify, current_app
 from src.models.user import db
 from src.models.village import Village
 from src.models.user_village import UserVillage
-from src.models.user_model import User, Role
-from src.routes.auth_routes import require_permission, get_current_user
-from datetime import datetime
+from src.models.user_model import User, Role, user_roles
+from src.routes.auth_routes import require_permission, get_current_user_id, jwt_has_role
+from sqlalchemy import select, func, cast, Integer
+from sqlalchemy.orm import selectinload, lazyload
+from datetime import datetime, timedelta
 import uuid
 
 user_village_bp = Blueprint('user_villages', __name__, url_prefix='/api/admin')
 
+def _invalid_uuid(values):
+    """First value that is not a well-formed UUID, or None if all parse"""
+    for value in values:
+        try:
+            uuid.UUID(str(value))
+        except ValueError:
+            return value
+    return None
+
+def _load_active_villages(village_ids):
+    """Load requested active villages in one IN query, returning (villages by id, missing ids)
+
+    Holding the returned villages keeps them in the session's identity map, so
+    assignment responses that include them do not query again.
+    """
+    village_ids = {uuid.UUID(str(village_id)) for village_id in village_ids}
+    villages = {
+        village.id: village
+        for village in Village.query.filter(Village.id.in_(village_ids), Village.is_active == True)
+    }
+    missing_ids = sorted(str(village_id) for village_id in village_ids - villages.keys())
+    return villages, missing_ids
+
 @user_village_bp.route('/users/<user_id>/villages', methods=['GET'])
 @require_permission('users.read')
 def get_user_villages(user_id):
     """Get villages assigned to specific user"""
     try:
-        current_user = get_current_user()
+        current_user_id = get_current_user_id()
+        is_superadmin = jwt_has_role('superadmin')
         
         # Check if user exists
         user = User.query.get(user_id)
@@ -27,7 +53,7 @@ def get_user_villages(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         # Non-super admins can only view their own villages
-        if not current_user.has_role('superadmin') and str(current_user.id) != user_id:
+        if not is_superadmin and str(current_user_id) != user_id:
             return jsonify({
                 'error': 'Access denied',
                 'code': 'INSUFFICIENT_PERMISSION'
@@ -35,13 +61,22 @@ def get_user_villages(user_id):
         
         active_only = request.args.get('active_only', 'true').lower() == 'true'
         
-        # Get user's village assignments
-        assignments = UserVillage.get_user_villages(user_id, active_only=active_only)
+        # Get user's village assignments, joined to just the village summary columns
+        # (no Village objects are built)
+        summary_columns = Village.summary_columns()
+        stmt = select(UserVillage, *summary_columns).join(
+            Village, UserVillage.village_id == Village.id
+        ).where(UserVillage.user_id == user_id)
+        if active_only:
+            stmt = stmt.where(UserVillage.is_active == True)
+        if is_superadmin:
+            stmt = stmt.options(selectinload(UserVillage.assigner).lazyload(User.roles))
         
+        summary_keys = [column.key for column in summary_columns]
         villages_data = []
-        for assignment in assignments:
-            village_data = assignment.village.to_summary()
-            village_data['assignment'] = assignment.to_dict(include_assigner=current_user.has_role('superadmin'))
+        for assignment, *summary in db.session.execute(stmt):
+            village_data = dict(zip(summary_keys, summary))
+            village_data['assignment'] = assignment.to_dict(include_assigner=is_superadmin)
             villages_data.append(village_data)
         
         return jsonify({
@@ -64,10 +99,10 @@ def get_user_villages(user_id):
 def assign_user_villages(user_id):
     """Assign villages to user (Super Admin only)"""
     try:
-        current_user = get_current_user()
+        current_user_id = get_current_user_id()
         
         # Only Super Admin can assign villages
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can assign villages to users',
                 'code': 'INSUFFICIENT_ROLE'
@@ -87,13 +122,19 @@ def assign_user_villages(user_id):
             return jsonify({'error': 'village_ids is required'}), 400
         
         # Validate village IDs
-        villages = Village.query.filter(
-            Village.id.in_(village_ids),
-            Village.is_active == True
-        ).all()
+        invalid_id = _invalid_uuid(village_ids)
+        if invalid_id is not None:
+            return jsonify({
+                'error': f'Invalid village id: {invalid_id}',
+                'invalid_village_id': str(invalid_id)
+            }), 400
         
-        if len(villages) != len(village_ids):
-            return jsonify({'error': 'One or more villages not found or inactive'}), 400
+        villages, missing_ids = _load_active_villages(village_ids)
+        if missing_ids:
+            return jsonify({
+                'error': 'One or more villages not found or inactive',
+                'missing_village_ids': missing_ids
+            }), 400
         
         # Get permission settings
         permissions = {
@@ -107,7 +148,7 @@ def assign_user_villages(user_id):
         assignments = UserVillage.bulk_assign_villages(
             user_id=user_id,
             village_ids=village_ids,
-            assigned_by_id=current_user.id,
+            assigned_by_id=current_user_id,
             assignment_type=data.get('assignment_type', 'manual'),
             **permissions
         )
@@ -115,26 +156,25 @@ def assign_user_villages(user_id):
         # Set primary village if specified
         set_primary = data.get('set_primary')
         if set_primary and set_primary in village_ids:
-            for assignment in assignments:
-                if str(assignment.village_id) == set_primary:
-                    assignment.set_as_primary()
-                    break
-        
-        db.session.commit()
+            UserVillage.set_primary_village(user_id, uuid.UUID(str(set_primary)))
         
         # Prepare response
+        db.session.flush()
         assignments_data = []
         for assignment in assignments:
             assignment_data = assignment.to_dict(include_village=True)
             assignments_data.append(assignment_data)
         
+        user_data = {
+            'id': str(user.id),
+            'username': user.username,
+            'full_name': user.full_name
+        }
+        db.session.commit()
+        
         return jsonify({
             'assignments': assignments_data,
-            'user': {
-                'id': str(user.id),
-                'username': user.username,
-                'full_name': user.full_name
-            },
+            'user': user_data,
             'message': f'Successfully assigned {len(assignments)} villages to user'
         }), 201
         
@@ -143,15 +183,13 @@ def assign_user_villages(user_id):
         current_app.logger.error(f"Error assigning villages to user {user_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@user_village_bp.route('/users/<user_id>/villages/<village_id>', methods=['PUT'])
+@user_village_bp.route('/users/<uuid:user_id>/villages/<uuid:village_id>', methods=['PUT'])
 @require_permission('users.assign_village')
 def update_user_village_assignment(user_id, village_id):
     """Update user-village assignment permissions"""
     try:
-        current_user = get_current_user()
-        
         # Only Super Admin can update assignments
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can update village assignments',
                 'code': 'INSUFFICIENT_ROLE'
@@ -161,7 +199,7 @@ def update_user_village_assignment(user_id, village_id):
         assignment = UserVillage.query.filter_by(
             user_id=user_id,
             village_id=village_id
-        ).first()
+        ).options(selectinload(UserVillage.village), selectinload(UserVillage.user)).first()
         
         if not assignment:
             return jsonify({'error': 'Assignment not found'}), 404
@@ -188,10 +226,12 @@ def update_user_village_assignment(user_id, village_id):
             else:
                 assignment.deactivate()
         
+        db.session.flush()
+        assignment_data = assignment.to_dict(include_village=True, include_user=True)
         db.session.commit()
         
         return jsonify({
-            'assignment': assignment.to_dict(include_village=True, include_user=True),
+            'assignment': assignment_data,
             'message': 'Assignment updated successfully'
         }), 200
         
@@ -200,15 +240,13 @@ def update_user_village_assignment(user_id, village_id):
         current_app.logger.error(f"Error updating assignment {user_id}-{village_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@user_village_bp.route('/users/<user_id>/villages/<village_id>', methods=['DELETE'])
+@user_village_bp.route('/users/<uuid:user_id>/villages/<uuid:village_id>', methods=['DELETE'])
 @require_permission('users.assign_village')
 def remove_user_village_assignment(user_id, village_id):
     """Remove user from village (Super Admin only)"""
     try:
-        current_user = get_current_user()
-        
         # Only Super Admin can remove assignments
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can remove village assignments',
                 'code': 'INSUFFICIENT_ROLE'
@@ -218,7 +256,7 @@ def remove_user_village_assignment(user_id, village_id):
         assignment = UserVillage.query.filter_by(
             user_id=user_id,
             village_id=village_id
-        ).first()
+        ).options(selectinload(UserVillage.village), selectinload(UserVillage.user)).first()
         
         if not assignment:
             return jsonify({'error': 'Assignment not found'}), 404
@@ -251,10 +289,10 @@ def remove_user_village_assignment(user_id, village_id):
 def create_village_admin():
     """Create new Village Admin user (Super Admin only)"""
     try:
-        current_user = get_current_user()
+        current_user_id = get_current_user_id()
         
         # Only Super Admin can create users
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can create users',
                 'code': 'INSUFFICIENT_ROLE'
@@ -281,8 +319,27 @@ def create_village_admin():
         if existing_user:
             return jsonify({'error': 'Username or email already exists'}), 400
         
-        # Create user
+        # Validate villages before anything is written
+        village_ids = data.get('villages', [])
+        if village_ids:
+            invalid_id = _invalid_uuid(village_ids)
+            if invalid_id is not None:
+                return jsonify({
+                    'error': f'Invalid village id: {invalid_id}',
+                    'invalid_village_id': str(invalid_id)
+                }), 400
+            
+            villages, missing_ids = _load_active_villages(village_ids)
+            if missing_ids:
+                return jsonify({
+                    'error': 'One or more villages not found or inactive',
+                    'missing_village_ids': missing_ids
+                }), 400
+        
+        # Create user; the id is generated here so assignments can reference it
+        # without flushing the INSERT first
         user = User(
+            id=uuid.uuid4(),
             username=data['username'],
             email=data['email'],
             first_name=data['first_name'],
@@ -293,30 +350,19 @@ def create_village_admin():
         )
         user.set_password(data['password'])
         
-        db.session.add(user)
-        db.session.flush()  # Get user ID
-        
-        # Assign role
+        # Assign role while the user is still transient, so the append neither
+        # autoflushes the user nor loads its (empty) roles collection
         role_name = data.get('role', 'village_admin')
-        role = Role.query.filter_by(name=role_name).first()
+        role = Role.query.options(lazyload(Role.permissions)).filter_by(name=role_name).first()
         if role:
             user.roles.append(role)
         
+        db.session.add(user)
+        
         # Assign villages if provided
-        village_ids = data.get('villages', [])
         assignments = []
         
         if village_ids:
-            # Validate villages
-            villages = Village.query.filter(
-                Village.id.in_(village_ids),
-                Village.is_active == True
-            ).all()
-            
-            if len(villages) != len(village_ids):
-                db.session.rollback()
-                return jsonify({'error': 'One or more villages not found or inactive'}), 400
-            
             # Create assignments
             permissions = data.get('permissions', {
                 'can_manage_properties': True,
@@ -328,13 +374,12 @@ def create_village_admin():
             assignments = UserVillage.bulk_assign_villages(
                 user_id=user.id,
                 village_ids=village_ids,
-                assigned_by_id=current_user.id,
+                assigned_by_id=current_user_id,
                 **permissions
             )
         
-        db.session.commit()
-        
         # Prepare response
+        db.session.flush()
         user_data = user.to_dict()
         user_data['role'] = role_name
         
@@ -345,6 +390,7 @@ def create_village_admin():
             villages_data.append(village_data)
         
         user_data['villages'] = villages_data
+        db.session.commit()
         
         # Send welcome email if requested
         if data.get('send_welcome_email', False):
@@ -366,10 +412,8 @@ def create_village_admin():
 def update_user_role(user_id):
     """Update user role (Super Admin only)"""
     try:
-        current_user = get_current_user()
-        
         # Only Super Admin can change roles
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can change user roles',
                 'code': 'INSUFFICIENT_ROLE'
@@ -419,10 +463,8 @@ def update_user_role(user_id):
 def get_all_assignments():
     """Get all user-village assignments (Super Admin only)"""
     try:
-        current_user = get_current_user()
-        
         # Only Super Admin can view all assignments
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can view all assignments',
                 'code': 'INSUFFICIENT_ROLE'
@@ -435,7 +477,13 @@ def get_all_assignments():
         user_id = request.args.get('user_id')
         
         # Build query
-        query = UserVillage.query
+        # Serialized users and assigners only need their own columns, so skip the eager
+        # roles/permissions subqueries User would otherwise run for each of them
+        query = UserVillage.query.options(
+            selectinload(UserVillage.user).lazyload(User.roles),
+            selectinload(UserVillage.village),
+            selectinload(UserVillage.assigner).lazyload(User.roles)
+        )
         
         if active_only:
             query = query.filter_by(is_active=True)
@@ -485,18 +533,22 @@ def get_all_assignments():
 def get_assignment_statistics():
     """Get assignment statistics (Super Admin only)"""
     try:
-        current_user = get_current_user()
-        
         # Only Super Admin can view statistics
-        if not current_user.has_role('superadmin'):
+        if not jwt_has_role('superadmin'):
             return jsonify({
                 'error': 'Only Super Admin can view assignment statistics',
                 'code': 'INSUFFICIENT_ROLE'
             }), 403
         
-        # Total assignments
-        total_assignments = UserVillage.query.count()
-        active_assignments = UserVillage.query.filter_by(is_active=True).count()
+        # Total, active and recent (last 30 days) assignments in one scan
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        counts = db.session.execute(
+            select(
+                func.count().label('total'),
+                func.count().filter(UserVillage.is_active == True).label('active'),
+                func.count().filter(UserVillage.assigned_at >= thirty_days_ago).label('recent')
+            ).select_from(UserVillage)
+        ).one()
         
         # Assignments by village
         village_stats = db.session.query(
@@ -507,26 +559,25 @@ def get_assignment_statistics():
             UserVillage.is_active == True
         ).group_by(Village.id, Village.name, Village.code).all()
         
-        # Assignments by user role
-        role_stats = db.session.query(
-            Role.name,
-            db.func.count(UserVillage.id).label('assignment_count')
-        ).join(User.roles).join(User, UserVillage.user_id == User.id).filter(
-            UserVillage.is_active == True
-        ).group_by(Role.name).all()
-        
-        # Recent assignments (last 30 days)
-        from datetime import timedelta
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_assignments = UserVillage.query.filter(
-            UserVillage.assigned_at >= thirty_days_ago
-        ).count()
+        # Assignments by user role: active assignments are counted per user first, so
+        # user_villages is scanned once and only the per-user counts meet user_roles
+        assignments_per_user = select(
+            UserVillage.user_id,
+            func.count().label('assignment_count')
+        ).where(UserVillage.is_active == True).group_by(UserVillage.user_id).cte('assignments_per_user')
+        role_stats = db.session.execute(
+            # SUM of counts is numeric on PostgreSQL; cast so it serializes as a number, not a Decimal string
+            select(Role.name, cast(func.sum(assignments_per_user.c.assignment_count), Integer))
+            .join(user_roles, user_roles.c.role_id == Role.id)
+            .join(assignments_per_user, assignments_per_user.c.user_id == user_roles.c.user_id)
+            .group_by(Role.name)
+        ).all()
         
         return jsonify({
-            'total_assignments': total_assignments,
-            'active_assignments': active_assignments,
-            'inactive_assignments': total_assignments - active_assignments,
-            'recent_assignments_30_days': recent_assignments,
+            'total_assignments': counts.total,
+            'active_assignments': counts.active,
+            'inactive_assignments': counts.total - counts.active,
+            'recent_assignments_30_days': counts.recent,
             'village_breakdown': [
                 {
                     'village_name': stat[0],
@@ -3,17 +3,83 @@ Village Management API Routes
 Smart Village Management System
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
 from src.models.user import db
 from src.models.village import Village
 from src.models.user_village import UserVillage
 from src.models.user_model import User
 from src.utils.jwt_auth import require_auth_service_permission, get_current_user_from_auth_service
-from datetime import datetime
+from src.utils.search import LIKE_ESCAPE, contains_pattern
+from sqlalchemy import select, bindparam, exists, func
+from sqlalchemy.orm import selectinload
+from dataclasses import dataclass
+from datetime import datetime, date
+import math
 import uuid
 
 village_bp = Blueprint('villages', __name__, url_prefix='/api/villages')
 
+@dataclass
+class VillageListParams:
+    """Village list query parameters, parsed once from request.args"""
+    page: int = 1
+    per_page: int = 20
+    search: str = ''
+    province: str = ''
+    district: str = ''
+    active_only: bool = True
+    
+    @classmethod
+    def from_args(cls, args):
+        """Parse pagination and filter parameters from a request.args snapshot"""
+        get = args.get
+        per_page = get('per_page', 20, type=int)
+        return cls(
+            page=max(get('page', 1, type=int), 1),
+            per_page=min(per_page, 100) if per_page > 0 else 20,
+            search=get('search', '').strip(),
+            province=get('province', '').strip(),
+            district=get('district', '').strip(),
+            active_only=get('active_only', 'true').lower() == 'true'
+        )
+
+def _filter_villages(stmt, search=None, province=None, district=None, active_only=True):
+    """Apply the shared village filters with named bind params so the compiled statement is cached"""
+    if active_only:
+        stmt = stmt.where(Village.is_active == True)
+    
+    if search:
+        # Wildcards in the search term match literally, as in the property address search
+        pattern = bindparam('search', contains_pattern(search))
+        stmt = stmt.where(db.or_(
+            Village.name.ilike(pattern, escape=LIKE_ESCAPE),
+            Village.code.ilike(pattern, escape=LIKE_ESCAPE)
+        ))
+    
+    if province:
+        stmt = stmt.where(Village.province == bindparam('province', province))
+    
+    if district:
+        stmt = stmt.where(Village.district == bindparam('district', district))
+    
+    return stmt
+
+def _paginate_stmt(stmt, params):
+    """Count a statement and return (pagination dict, statement for the requested page)"""
+    total = db.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar()
+    pages = math.ceil(total / params.per_page) if total else 0
+    
+    pagination = {
+        'page': params.page,
+        'per_page': params.per_page,
+        'total': total,
+        'pages': pages,
+        'has_next': params.page < pages,
+        'has_prev': params.page > 1
+    }
+    page_stmt = stmt.limit(params.per_page).offset((params.page - 1) * params.per_page)
+    return pagination, page_stmt
+
 def require_village_permission(permission):
     """Decorator to check village-scoped permissions"""
     def decorator(f):
@@ -24,13 +90,13 @@ def require_village_permission(permission):
             if not current_user:
                 return jsonify({'error': 'Authentication required'}), 401
             
-            village_id = kwargs.get('village_id') or request.view_args.get('village_id')
-            
-            # Super Admin bypasses village scope
-            if current_user.has_role('superadmin'):
+            # Super Admin bypasses village scope (computed once per request)
+            if current_user.is_superadmin:
                 return f(*args, **kwargs)
             
-            # Check basic permission
+            village_id = kwargs.get('village_id') or request.view_args.get('village_id')
+            
+            # Check basic permission (cheap, in-memory) before the scope lookup
             if not current_user.has_permission(permission):
                 return jsonify({
                     'error': f'Permission {permission} required',
@@ -50,95 +116,45 @@ def require_village_permission(permission):
 
 @village_bp.route('', methods=['GET'])
 @require_auth_service_permission('villages.read')
-def get_villages(current_user):
+def get_villages():
     """Get villages (all for Super Admin, assigned for Village Admin)"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
-        search = request.args.get('search', '').strip()
-        province = request.args.get('province', '').strip()
-        district = request.args.get('district', '').strip()
-        active_only = request.args.get('active_only', 'true').lower() == 'true'
-        
-        # Super Admin gets all villages
-        if current_user.has_role('superadmin'):
-            query = Village.query
-            
-            if active_only:
-                query = query.filter(Village.is_active == True)
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Village.name.ilike(f'%{search}%'),
-                        Village.code.ilike(f'%{search}%')
-                    )
-                )
-            
-            if province:
-                query = query.filter(Village.province == province)
-            
-            if district:
-                query = query.filter(Village.district == district)
-            
-            query = query.order_by(Village.name)
-            
-        else:
-            # Village Admin gets only assigned villages
-            query = db.session.query(Village).join(UserVillage).filter(
+        current_user = g.current_user
+        params = VillageListParams.from_args(request.args)
+        
+        stmt = _filter_villages(select(Village), params.search, params.province, params.district, params.active_only)
+        
+        # Super Admin gets all villages, Village Admin only assigned ones
+        if not current_user.is_superadmin:
+            stmt = stmt.where(exists().where(
                 UserVillage.user_id == current_user.id,
+                UserVillage.village_id == Village.id,
                 UserVillage.is_active == True
-            )
-            
-            if active_only:
-                query = query.filter(Village.is_active == True)
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Village.name.ilike(f'%{search}%'),
-                        Village.code.ilike(f'%{search}%')
-                    )
-                )
-            
-            query = query.order_by(Village.name)
+            ))
         
         # Paginate results
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+        pagination, page_stmt = _paginate_stmt(stmt.order_by(Village.name), params)
+        
+        # Add assignment info for Village Admin (one lookup for the whole page)
+        assignments = {}
+        if not current_user.is_superadmin:
+            assignments = {
+                assignment.village_id: assignment.to_dict()
+                for assignment in UserVillage.query.filter_by(user_id=current_user.id, is_active=True)
+            }
         
         villages = []
-        for village in pagination.items:
+        for village in db.session.execute(page_stmt).scalars():
             village_data = village.to_dict()
-            
-            # Add assignment info for Village Admin
-            if not current_user.has_role('superadmin'):
-                assignment = UserVillage.query.filter_by(
-                    user_id=current_user.id,
-                    village_id=village.id,
-                    is_active=True
-                ).first()
-                
-                if assignment:
-                    village_data['assignment'] = assignment.to_dict()
-            
+            if village.id in assignments:
+                village_data['assignment'] = assignments[village.id]
             villages.append(village_data)
         
         return jsonify({
             'villages': villages,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            },
+            'pagination': pagination,
             'user_role': current_user.role if hasattr(current_user, 'role') else None,
-            'access_scope': 'all' if current_user.has_role('superadmin') else 'assigned_only'
+            'access_scope': 'all' if current_user.is_superadmin else 'assigned_only'
         }), 200
         
     except Exception as e:
@@ -153,7 +169,7 @@ def create_village():
         current_user = get_current_user_from_auth_service()
         
         # Only Super Admin can create villages
-        if not current_user.has_role('superadmin'):
+        if not current_user.is_superadmin:
             return jsonify({
                 'error': 'Only Super Admin can create villages',
                 'code': 'INSUFFICIENT_ROLE'
@@ -173,6 +189,12 @@ def create_village():
         if Village.query.filter_by(code=data['code']).first():
             return jsonify({'error': 'Village code already exists'}), 400
         
+        # Parse established date (ISO-8601, YYYY-MM-DD)
+        try:
+            established_date = date.fromisoformat(data['established_date']) if data.get('established_date') else None
+        except ValueError as e:
+            return jsonify({'error': f'Invalid date format: {str(e)}'}), 400
+        
         # Create village
         try:
             village = Village(
@@ -187,7 +209,7 @@ def create_village():
                 contact_person=data.get('contact_person', ''),
                 contact_phone=data.get('contact_phone', ''),
                 contact_email=data.get('contact_email', ''),
-                established_date=data.get('established_date'),
+                established_date=established_date,
                 is_active=data.get('is_active', True),
                 is_verified=data.get('is_verified', False),
                 created_by=current_user.id
@@ -196,15 +218,17 @@ def create_village():
             return jsonify({'error': f'Error creating village: {str(e)}'}), 400
         
         db.session.add(village)
+        db.session.flush()
+        village_data = {
+            'id': village.id,
+            'name': village.name,
+            'code': village.code
+        }
         db.session.commit()
         
         return jsonify({
             'message': 'Village created successfully',
-            'village': {
-                'id': village.id,
-                'name': village.name,
-                'code': village.code
-            }
+            'village': village_data
         }), 201
         
     except Exception as e:
@@ -212,7 +236,7 @@ def create_village():
         current_app.logger.error(f"Error creating village: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@village_bp.route('/<village_id>', methods=['GET'])
+@village_bp.route('/<uuid:village_id>', methods=['GET'])
 @require_village_permission('villages.read')
 def get_village(village_id):
     """Get specific village details"""
@@ -223,10 +247,10 @@ def get_village(village_id):
         if not village:
             return jsonify({'error': 'Village not found'}), 404
         
-        village_data = village.to_dict(include_sensitive=current_user.has_role('superadmin'))
+        village_data = village.to_dict(include_sensitive=current_user.is_superadmin)
         
         # Add assignment info for Village Admin
-        if not current_user.has_role('superadmin'):
+        if not current_user.is_superadmin:
             assignment = UserVillage.query.filter_by(
                 user_id=current_user.id,
                 village_id=village.id,
@@ -237,12 +261,12 @@ def get_village(village_id):
                 village_data['assignment'] = assignment.to_dict()
         
         # Add statistics for authorized users
-        if current_user.has_permission('reports.property') or current_user.has_role('superadmin'):
+        if current_user.is_superadmin or current_user.has_permission('reports.property'):
             # This would be implemented when property/resident models are available
             village_data['statistics'] = {
                 'total_properties': village.total_properties,
                 'total_residents': village.total_residents,
-                'active_admins': len(village.get_village_admins())
+                'active_admins': village.count_village_admins()
             }
         
         return jsonify({'village': village_data}), 200
@@ -251,7 +275,7 @@ def get_village(village_id):
         current_app.logger.error(f"Error getting village {village_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@village_bp.route('/<village_id>', methods=['PUT'])
+@village_bp.route('/<uuid:village_id>', methods=['PUT'])
 @require_village_permission('villages.update')
 def update_village(village_id):
     """Update village information"""
@@ -276,27 +300,29 @@ def update_village(village_id):
         updatable_fields = [
             'name', 'code', 'description', 'address', 'province', 'district',
             'sub_district', 'postal_code', 'contact_person', 'contact_phone',
-            'contact_email', 'is_verified'
+            'contact_email', 'established_date', 'is_verified'
         ]
         
         # Super Admin can update additional fields
-        if current_user.has_role('superadmin'):
+        if current_user.is_superadmin:
             updatable_fields.extend(['is_active', 'total_properties', 'total_residents'])
         
         for field in updatable_fields:
             if field in data:
                 if field == 'established_date' and data[field]:
-                    setattr(village, field, datetime.strptime(data[field], '%Y-%m-%d').date())
+                    setattr(village, field, date.fromisoformat(data[field]))
                 else:
                     setattr(village, field, data[field])
         
         village.updated_by = current_user.id
         village.updated_at = datetime.utcnow()
         
+        db.session.flush()
+        village_data = village.to_dict(include_sensitive=current_user.is_superadmin)
         db.session.commit()
         
         return jsonify({
-            'village': village.to_dict(include_sensitive=current_user.has_role('superadmin')),
+            'village': village_data,
             'message': 'Village updated successfully'
         }), 200
         
@@ -307,16 +333,15 @@ def update_village(village_id):
         current_app.logger.error(f"Error updating village {village_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@village_bp.route('/<village_id>', methods=['DELETE'])
+@village_bp.route('/<uuid:village_id>', methods=['DELETE'])
 @require_auth_service_permission('villages.delete')
-def delete_village(village_id, current_user=None):
+def delete_village(village_id):
     """Delete village (Super Admin only)"""
     try:
-        if current_user is None:
-            current_user = get_current_user_from_auth_service()
+        current_user = g.current_user
         
         # Only Super Admin can delete villages
-        if not current_user.has_role('superadmin'):
+        if not current_user.is_superadmin:
             return jsonify({
                 'error': 'Only Super Admin can delete villages',
                 'code': 'INSUFFICIENT_ROLE'
@@ -355,7 +380,7 @@ def delete_village(village_id, current_user=None):
         current_app.logger.error(f"Error deleting village {village_id}: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@village_bp.route('/<village_id>/users', methods=['GET'])
+@village_bp.route('/<uuid:village_id>/users', methods=['GET'])
 @require_village_permission('users.read')
 def get_village_users(village_id):
     """Get users assigned to village"""
@@ -366,43 +391,32 @@ def get_village_users(village_id):
         if not village:
             return jsonify({'error': 'Village not found'}), 404
         
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
-        active_only = request.args.get('active_only', 'true').lower() == 'true'
+        params = VillageListParams.from_args(request.args)
         
-        # Get user assignments for this village
-        query = UserVillage.query.filter_by(village_id=village_id)
+        include_assigner = current_user.is_superadmin
         
-        if active_only:
-            query = query.filter_by(is_active=True)
+        # Get user assignments for this village
+        # Only the user's and assigner's own columns are serialized; skip their eager roles subqueries
+        stmt = select(UserVillage).where(UserVillage.village_id == village_id).options(
+            selectinload(UserVillage.user).lazyload(User.roles)
+        )
+        if include_assigner:
+            stmt = stmt.options(selectinload(UserVillage.assigner).lazyload(User.roles))
         
-        query = query.order_by(UserVillage.assigned_at.desc())
+        if params.active_only:
+            stmt = stmt.where(UserVillage.is_active == True)
         
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination, page_stmt = _paginate_stmt(stmt.order_by(UserVillage.assigned_at.desc()), params)
         
-        assignments = []
-        for assignment in pagination.items:
-            assignment_data = assignment.to_dict(
-                include_user=True,
-                include_assigner=current_user.has_role('superadmin')
-            )
-            assignments.append(assignment_data)
+        assignments = [
+            assignment.to_dict(include_user=True, include_assigner=include_assigner)
+            for assignment in db.session.execute(page_stmt).scalars()
+        ]
         
         return jsonify({
             'assignments': assignments,
             'village': village.to_summary(),
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination
         }), 200
         
     except Exception as e:
@@ -411,51 +425,27 @@ def get_village_users(village_id):
 
 @village_bp.route('/search', methods=['GET'])
 @require_auth_service_permission('villages.read')
-def search_villages(current_user=None):
+def search_villages():
     """Search villages by name, code, or location"""
     try:
-        if current_user is None:
-            current_user = get_current_user_from_auth_service()
+        current_user = g.current_user
         
-        query = request.args.get('q', '').strip()
-        province = request.args.get('province', '').strip()
-        district = request.args.get('district', '').strip()
-        limit = min(request.args.get('limit', 10, type=int), 50)
+        args = request.args
+        query = args.get('q', '').strip()
+        province = args.get('province', '').strip()
+        district = args.get('district', '').strip()
+        limit = min(args.get('limit', 10, type=int), 50)
         
         if not query and not province and not district:
             return jsonify({'villages': []}), 200
         
-        # Super Admin searches all villages
-        if current_user.has_role('superadmin'):
-            villages = Village.search_villages(
-                query=query,
-                province=province,
-                district=district
-            )[:limit]
-        else:
-            # Village Admin searches only assigned villages
-            village_ids = [a.village_id for a in current_user.get_village_assignments()]
-            
-            search_query = Village.query.filter(
-                Village.id.in_(village_ids),
-                Village.is_active == True
-            )
-            
-            if query:
-                search_query = search_query.filter(
-                    db.or_(
-                        Village.name.ilike(f'%{query}%'),
-                        Village.code.ilike(f'%{query}%')
-                    )
-                )
-            
-            if province:
-                search_query = search_query.filter(Village.province == province)
-            
-            if district:
-                search_query = search_query.filter(Village.district == district)
-            
-            villages = search_query.order_by(Village.name).limit(limit).all()
+        stmt = _filter_villages(select(Village), query, province, district)
+        
+        # Village Admin searches only assigned villages
+        if not current_user.is_superadmin:
+            stmt = stmt.where(Village.id.in_(current_user.village_ids))
+        
+        villages = db.session.execute(stmt.order_by(Village.name).limit(limit)).scalars().all()
         
         return jsonify({
             'villages': [village.to_summary() for village in villages],
@@ -469,26 +459,18 @@ def search_villages(current_user=None):
 
 @village_bp.route('/provinces', methods=['GET'])
 @require_auth_service_permission('villages.read')
-def get_provinces(current_user=None):
+def get_provinces():
     """Get list of provinces with villages"""
     try:
-        if current_user is None:
-            current_user = get_current_user_from_auth_service()
+        current_user = g.current_user
         
-        if current_user.has_role('superadmin'):
-            # Super Admin sees all provinces
-            provinces = db.session.query(Village.province).filter(
-                Village.province.isnot(None),
-                Village.is_active == True
-            ).distinct().order_by(Village.province).all()
-        else:
-            # Village Admin sees provinces of assigned villages only
-            village_ids = [a.village_id for a in current_user.get_village_assignments()]
-            provinces = db.session.query(Village.province).filter(
-                Village.id.in_(village_ids),
-                Village.province.isnot(None),
-                Village.is_active == True
-            ).distinct().order_by(Village.province).all()
+        stmt = _filter_villages(select(Village.province).where(Village.province.isnot(None)))
+        
+        # Village Admin sees provinces of assigned villages only
+        if not current_user.is_superadmin:
+            stmt = stmt.where(Village.id.in_(current_user.village_ids))
+        
+        provinces = db.session.execute(stmt.distinct().order_by(Village.province)).all()
         
         return jsonify({
             'provinces': [p[0] for p in provinces]
@@ -500,32 +482,25 @@ def get_provinces(current_user=None):
 
 @village_bp.route('/districts', methods=['GET'])
 @require_auth_service_permission('villages.read')
-def get_districts(current_user=None):
+def get_districts():
     """Get list of districts for a province"""
     try:
-        if current_user is None:
-            current_user = get_current_user_from_auth_service()
+        current_user = g.current_user
         province = request.args.get('province')
         
         if not province:
             return jsonify({'error': 'Province parameter required'}), 400
         
-        if current_user.has_role('superadmin'):
-            # Super Admin sees all districts in province
-            districts = db.session.query(Village.district).filter(
-                Village.province == province,
-                Village.district.isnot(None),
-                Village.is_active == True
-            ).distinct().order_by(Village.district).all()
-        else:
-            # Village Admin sees districts of assigned villages only
-            village_ids = [a.village_id for a in current_user.get_village_assignments()]
-            districts = db.session.query(Village.district).filter(
-                Village.id.in_(village_ids),
-                Village.province == province,
-                Village.district.isnot(None),
-                Village.is_active == True
-            ).distinct().order_by(Village.district).all()
+        stmt = _filter_villages(
+            select(Village.district).where(Village.district.isnot(None)),
+            province=province
+        )
+        
+        # Village Admin sees districts of assigned villages only
+        if not current_user.is_superadmin:
+            stmt = stmt.where(Village.id.in_(current_user.village_ids))
+        
+        districts = db.session.execute(stmt.distinct().order_by(Village.district)).all()
         
         return jsonify({
             'districts': [d[0] for d in districts],
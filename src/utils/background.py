@@ -0,0 +1,25 @@
+"""
+Background Write Queue
+Smart Village Management System
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+# Small pool for writes whose response does not depend on the committed row
+BACKGROUND_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='background-write')
+
+def submit(fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) off the request thread inside its own app context"""
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                app.logger.error(f"Background write {fn.__name__} failed: {str(e)}")
+
+    return _executor.submit(run)
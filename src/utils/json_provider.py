@@ -0,0 +1,40 @@
+"""
+orjson-backed JSON Provider
+Smart Village Management System
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson instead of stdlib json"""
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_UUID | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON to a string"""
+        option = self.option
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+
+        # Anything orjson can't handle natively (Decimal, dataclasses, ...)
+        # falls back to Flask's default encoder
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def dumpb(self, obj):
+        """Serialize data as compact JSON bytes (no str round trip)"""
+        return orjson.dumps(obj, default=self.default, option=self.option)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response, encoding straight to bytes"""
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+
+        body = orjson.dumps(obj, default=self.default, option=option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON from a string or bytes"""
+        return orjson.loads(s)
@@ -5,13 +5,118 @@ Smart Village Management System
 
 import jwt
 import os
-from flask import request, jsonify, current_app
+import threading
+import time
+from collections import OrderedDict
+from flask import request, jsonify, current_app, g
 from functools import wraps
+from src.models.user import db
 from src.models.user_model import User
+from src.models.user_village import UserVillage
 import uuid
 
-def verify_auth_service_token():
-    """Verify JWT token from Auth Service"""
+# Auth Service signing secret, read from the environment once at import
+_JWT_SECRET = os.getenv('JWT_SECRET_KEY', 'SmartVillage2025!AuthJWTSecret')
+_JWT_ALGORITHMS = ['HS256']
+
+# Verified tokens: raw token -> (payload, expires_at, TokenUser).
+# Entries expire at the token's exp claim, capped at TOKEN_CACHE_TTL seconds
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX = 10000
+
+# Longest bearer token worth attempting to decode
+MAX_TOKEN_LENGTH = 4096
+
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+class TokenUser:
+    """User object built directly from an Auth Service JWT payload"""
+    def __init__(self, payload):
+        # Parsed once so it binds natively against the UUID id columns
+        try:
+            self.id = uuid.UUID(str(payload.get('id')))
+        except ValueError:
+            self.id = payload.get('id')
+        self.username = payload.get('username')
+        self.email = payload.get('email')
+        self.role = payload.get('role')
+        self.roles = [self.role] if self.role else []  # Add roles attribute
+        # Same name as User.is_superadmin; fixed by the token, so computed once
+        self.is_superadmin = self.role == 'superadmin'
+        self.permissions_data = payload.get('permissions', {})
+        # "category.action" strings, built once so has_permission is a set lookup
+        self._perm_set = frozenset(
+            f'{category}.{action}'
+            for category, actions in self.permissions_data.items()
+            for action in actions
+        ) if isinstance(self.permissions_data, dict) else frozenset()
+        self.is_active = True  # Assume active if token is valid
+    
+    def has_role(self, role_name):
+        """Check if user has specific role"""
+        return self.role == role_name
+    
+    def has_permission(self, permission_name):
+        """Check if user has specific permission"""
+        if self.role == 'superadmin':
+            return True  # Super admin has all permissions
+        
+        return permission_name in self._perm_set
+    
+    @property
+    def village_ids(self):
+        """Frozenset of active village UUIDs, loaded once per request"""
+        village_ids = g.get('user_villages')
+        if village_ids is None:
+            rows = db.session.query(UserVillage.village_id).filter_by(
+                user_id=self.id,
+                is_active=True
+            ).all()
+            village_ids = frozenset(row[0] for row in rows)
+            g.user_villages = village_ids
+        return village_ids
+    
+    def has_village_access(self, village_id):
+        """Check if user has access to specific village"""
+        if self.role == 'superadmin':
+            return True
+        if not isinstance(village_id, uuid.UUID):
+            try:
+                village_id = uuid.UUID(str(village_id))
+            except ValueError:
+                return False
+        return village_id in self.village_ids
+
+def _get_cached_token(token):
+    """Return the cached (payload, expires_at, user) entry for a token that has not expired"""
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del _token_cache[token]
+            return None
+        _token_cache.move_to_end(token)
+        return entry
+
+def _cache_token(token, payload):
+    """Cache a successfully verified token (failed validations are never cached)"""
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    exp = payload.get('exp')
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    
+    entry = (payload, expires_at, TokenUser(payload))
+    with _token_cache_lock:
+        _token_cache[token] = entry
+        if len(_token_cache) > TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)
+    return entry
+
+def _authenticate_auth_service_token():
+    """Verify the bearer token, returning ((payload, expires_at, user), error)"""
     try:
         # Get token from Authorization header
         auth_header = request.headers.get('Authorization')
@@ -19,18 +124,23 @@ def verify_auth_service_token():
             return None, 'No authorization header'
         
         # Extract token from "Bearer <token>"
-        try:
-            token = auth_header.split(' ')[1]
-        except IndexError:
+        _, separator, token = auth_header.partition(' ')
+        if not separator:
             return None, 'Invalid authorization header format'
         
-        # Get JWT secret from environment
-        jwt_secret = os.getenv('JWT_SECRET_KEY', 'SmartVillage2025!AuthJWTSecret')
+        # A JWT is three dot-separated segments; reject anything else without any crypto
+        if token.count('.') != 2 or len(token) > MAX_TOKEN_LENGTH:
+            return None, 'Invalid token'
+        
+        # Tokens are reused for many requests; skip signature verification on a hit
+        entry = _get_cached_token(token)
+        if entry is not None:
+            return entry, None
         
         # Decode token
         try:
-            payload = jwt.decode(token, jwt_secret, algorithms=['HS256'])
-            return payload, None
+            payload = jwt.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS)
+            return _cache_token(token, payload), None
         except jwt.ExpiredSignatureError:
             return None, 'Token has expired'
         except jwt.InvalidTokenError:
@@ -40,46 +150,30 @@ def verify_auth_service_token():
         current_app.logger.error(f"JWT verification error: {str(e)}")
         return None, f'Token verification failed: {str(e)}'
 
+def verify_auth_service_token():
+    """Verify JWT token from Auth Service"""
+    entry, error = _authenticate_auth_service_token()
+    if error:
+        return None, error
+    return entry[0], None
+
 def get_current_user_from_auth_service():
-    """Get current user from Auth Service JWT token"""
+    """Get current user from Auth Service JWT token (resolved once per request and kept on g)"""
     try:
-        payload, error = verify_auth_service_token()
+        user = g.get('current_user')
+        if user is not None:
+            return user
+        
+        entry, error = _authenticate_auth_service_token()
         if error:
             current_app.logger.warning(f"Auth verification failed: {error}")
             return None
         
-        # Create a user object from JWT payload directly
-        class TokenUser:
-            def __init__(self, payload):
-                self.id = payload.get('id')
-                self.username = payload.get('username')
-                self.email = payload.get('email')
-                self.role = payload.get('role')
-                self.roles = [self.role] if self.role else []  # Add roles attribute
-                self.permissions_data = payload.get('permissions', {})
-                self.is_active = True  # Assume active if token is valid
-            
-            def has_role(self, role_name):
-                """Check if user has specific role"""
-                return self.role == role_name
-            
-            def has_permission(self, permission_name):
-                """Check if user has specific permission"""
-                if self.role == 'superadmin':
-                    return True  # Super admin has all permissions
-                
-                # Parse permission format: "category.action"
-                try:
-                    category, action = permission_name.split('.')
-                    category_permissions = self.permissions_data.get(category, [])
-                    return action in category_permissions
-                except (ValueError, AttributeError):
-                    return False
-        
-        # Create user object from token payload
-        user = TokenUser(payload)
+        # User object built from the token payload when the token was first verified
+        user = entry[2]
         
         current_app.logger.info(f"Successfully authenticated user from token: {user.username}")
+        g.current_user = user
         return user
         
     except Exception as e:
@@ -103,8 +197,8 @@ def require_auth_service_permission(permission_name):
                         'code': 'PERMISSION_DENIED'
                     }), 403
                 
-                # Add current_user to kwargs for use in route function
-                kwargs['current_user'] = current_user
+                # Share current_user with the route function through g
+                g.current_user = current_user
                 return f(*args, **kwargs)
                 
             except Exception as e:
@@ -125,8 +219,8 @@ def require_auth_service_login():
                 if not current_user:
                     return jsonify({'error': 'Authentication failed'}), 401
                 
-                # Add current_user to kwargs for use in route function
-                kwargs['current_user'] = current_user
+                # Share current_user with the route function through g
+                g.current_user = current_user
                 return f(*args, **kwargs)
                 
             except Exception as e:
@@ -0,0 +1,54 @@
+"""
+Caching JWT Manager
+Smart Village Management System
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask_jwt_extended import JWTManager
+
+# Decoded access/refresh tokens keyed by a SHA-256 prefix of the raw token.
+# Entries live at most JWT_DECODE_CACHE_TTL seconds and never past the token's exp
+JWT_DECODE_CACHE_TTL = 5
+JWT_DECODE_CACHE_MAX = 10000
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips signature verification for tokens it verified moments ago"""
+
+    def __init__(self, app=None, add_context_processor=False):
+        self._decode_cache = OrderedDict()
+        self._decode_cache_lock = threading.Lock()
+        super().__init__(app, add_context_processor)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Only plain header tokens are cached; CSRF and allow_expired decodes always verify
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        key = hashlib.sha256(encoded_token.encode()).digest()[:16]
+        now = time.time()
+
+        with self._decode_cache_lock:
+            entry = self._decode_cache.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._decode_cache.move_to_end(key)
+                    return dict(entry[0])
+                del self._decode_cache[key]
+
+        # Failed verifications raise here and are never cached
+        payload = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        expires_at = now + JWT_DECODE_CACHE_TTL
+        exp = payload.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+
+        with self._decode_cache_lock:
+            self._decode_cache[key] = (payload, expires_at)
+            if len(self._decode_cache) > JWT_DECODE_CACHE_MAX:
+                self._decode_cache.popitem(last=False)
+
+        return dict(payload)
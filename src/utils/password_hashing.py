@@ -0,0 +1,32 @@
+"""
+Password Hashing
+Smart Village Management System
+"""
+
+from werkzeug import security
+
+try:
+    import gevent
+    from gevent import monkey
+except ImportError:  # sync/gthread workers and local development
+    gevent = None
+
+# PBKDF2/scrypt run inside OpenSSL with the GIL released, so OS threads hash in
+# parallel across cores. Under gevent workers a hash computed on the request
+# greenlet would instead stall every connection of the worker for its full
+# duration; gevent's native thread pool runs it on a real thread while the
+# greenlet yields
+
+def _off_event_loop(fn, *args):
+    """Run fn(*args) on gevent's native thread pool when gevent is active, inline otherwise"""
+    if gevent is not None and monkey.is_module_patched('threading'):
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+def check_password_hash(password_hash, password):
+    """werkzeug check_password_hash without blocking the event loop"""
+    return _off_event_loop(security.check_password_hash, password_hash, password)
+
+def generate_password_hash(password, method):
+    """werkzeug generate_password_hash without blocking the event loop"""
+    return _off_event_loop(security.generate_password_hash, password, method)
@@ -0,0 +1,287 @@
+"""
+Permission Cache
+Smart Village Management System
+"""
+
+import selectors
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session, object_session
+from src.models.user import db
+from src.models.user_model import User, Role, Permission, user_roles, role_permissions
+from src.models.user_village import UserVillage
+
+# (user_id, permission, village_id) -> (allowed, expires_at)
+PERMISSION_CACHE_TTL = 60
+PERMISSION_CACHE_MAX = 10000
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+# Bumped by every invalidation; a result computed across a bump may predate the change
+_generation = 0
+
+def cached(user_id, permission, village_id, compute):
+    """Return the cached result for (user_id, permission, village_id), calling compute() on a miss"""
+    key = (str(user_id), permission, str(village_id) if village_id else None)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[1] > now:
+            _cache.move_to_end(key)
+            return entry[0]
+        generation = _generation
+
+    result = compute()
+
+    with _lock:
+        # Invalidated while computing: return the result but do not keep it
+        if _generation != generation:
+            return result
+        _cache[key] = (result, now + PERMISSION_CACHE_TTL)
+        _cache.move_to_end(key)
+        if len(_cache) > PERMISSION_CACHE_MAX:
+            _cache.popitem(last=False)
+
+    return result
+
+def check(user, permission=None, village_id=None):
+    """Check a permission and/or village access for user, cached per process for PERMISSION_CACHE_TTL seconds"""
+    def compute():
+        allowed = True
+        if permission:
+            allowed = user.has_permission(permission)
+        if allowed and village_id:
+            allowed = user.has_village_access(village_id)
+        return allowed
+
+    return cached(user.id, permission, village_id, compute)
+
+# Permission names, resources and (resource, action) pairs granted to a user
+PermissionSet = namedtuple('PermissionSet', ['names', 'resources', 'pairs'])
+
+# cache key "permission" under which a user's whole PermissionSet is stored
+PERMISSION_SET_KEY = '*'
+
+def _load_permission_set(user_id):
+    """Load a user's permissions in one query, deduplicated across roles by the database (None if the user does not exist)"""
+    rows = db.session.execute(
+        select(Permission.name, Permission.resource, Permission.action)
+        .select_from(User)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .outerjoin(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+        .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+        .where(User.id == user_id)
+        .distinct()
+    ).all()
+
+    if not rows:
+        return None
+
+    # A user without roles comes back as a single all-NULL row
+    rows = [row for row in rows if row.name is not None]
+    return PermissionSet(
+        names=frozenset(row.name for row in rows),
+        resources=frozenset(row.resource for row in rows),
+        pairs=frozenset((row.resource, row.action) for row in rows)
+    )
+
+def get_user_permission_set(user_id):
+    """A user's PermissionSet (None if the user does not exist), cached for PERMISSION_CACHE_TTL seconds"""
+    return cached(user_id, PERMISSION_SET_KEY, None, lambda: _load_permission_set(user_id))
+
+# cache key "permission" under which a role's PermissionSet is stored
+ROLE_PERMISSION_SET_KEY = 'role:*'
+
+def _load_role_permission_set(role_id):
+    """Load a role's permissions in one query"""
+    rows = db.session.execute(
+        select(Permission.name, Permission.resource, Permission.action)
+        .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+        .where(role_permissions.c.role_id == role_id)
+    ).all()
+
+    return PermissionSet(
+        names=frozenset(row.name for row in rows),
+        resources=frozenset(row.resource for row in rows),
+        pairs=frozenset((row.resource, row.action) for row in rows)
+    )
+
+def get_roles_permission_set(roles):
+    """Union of the PermissionSets of roles, each cached for PERMISSION_CACHE_TTL seconds"""
+    sets = [
+        cached(role.id, ROLE_PERMISSION_SET_KEY, None, lambda role_id=role.id: _load_role_permission_set(role_id))
+        for role in roles
+    ]
+    return PermissionSet(
+        names=frozenset().union(*(perms.names for perms in sets)),
+        resources=frozenset().union(*(perms.resources for perms in sets)),
+        pairs=frozenset().union(*(perms.pairs for perms in sets))
+    )
+
+# cache key "permission" under which a user's role names are stored
+ROLE_NAMES_KEY = 'roles:*'
+
+def _load_role_names(user_id):
+    """Load a user's role names, lowercased (None if the user does not exist)"""
+    rows = db.session.execute(
+        select(User.id, Role.name)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .outerjoin(Role, Role.id == user_roles.c.role_id)
+        .where(User.id == user_id)
+    ).all()
+
+    if not rows:
+        return None
+    return frozenset(row.name.lower() for row in rows if row.name is not None)
+
+def get_user_role_names(user_id):
+    """A user's lowercased role names (None if the user does not exist), cached for PERMISSION_CACHE_TTL seconds"""
+    return cached(user_id, ROLE_NAMES_KEY, None, lambda: _load_role_names(user_id))
+
+def invalidate_user(user_id):
+    """Drop every cached entry for a user"""
+    global _generation
+    user_id = str(user_id)
+    with _lock:
+        _generation += 1
+        for key in [key for key in _cache if key[0] == user_id]:
+            del _cache[key]
+
+def clear():
+    """Drop the whole cache"""
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+
+# Cross-process invalidation (PostgreSQL): changes are announced with NOTIFY inside
+# the writing transaction, so other workers only hear about committed changes.
+# Payloads are a user id, or NOTIFY_CLEAR_ALL to drop the whole cache
+INVALIDATION_CHANNEL = 'permission_cache'
+NOTIFY_CLEAR_ALL = '*'
+# More users than this in one flush are announced as a single clear
+NOTIFY_MAX_USERS = 100
+# Listener wake-up interval (to probe the connection) and reconnect backoff bounds, in seconds
+LISTEN_POLL_SECONDS = 60
+LISTEN_RETRY_SECONDS = 1
+LISTEN_RETRY_MAX_SECONDS = 60
+
+# session.info key of the payloads to announce at the session's next flush
+_PENDING_NOTIFY_KEY = 'permission_cache_notify'
+
+def _announce(target, payload):
+    """Queue payload for NOTIFY at the next flush of target's session"""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_NOTIFY_KEY, set()).add(payload)
+
+# Invalidate on role and village assignment changes made in this process right away;
+# other workers hear about them through NOTIFY (or when their entries expire)
+@event.listens_for(UserVillage, 'after_insert')
+@event.listens_for(UserVillage, 'after_update')
+@event.listens_for(UserVillage, 'after_delete')
+def invalidate_on_assignment_change(mapper, connection, target):
+    invalidate_user(target.user_id)
+    _announce(target, str(target.user_id))
+
+@event.listens_for(User.roles, 'append')
+@event.listens_for(User.roles, 'remove')
+def invalidate_on_role_change(target, value, initiator):
+    invalidate_user(target.id)
+    if target.id is not None:
+        _announce(target, str(target.id))
+
+@event.listens_for(Role.permissions, 'append')
+@event.listens_for(Role.permissions, 'remove')
+def invalidate_on_permission_change(target, value, initiator):
+    clear()
+    _announce(target, NOTIFY_CLEAR_ALL)
+
+@event.listens_for(Session, 'after_flush')
+def notify_other_workers(session, flush_context):
+    payloads = session.info.pop(_PENDING_NOTIFY_KEY, None)
+    if not payloads or session.get_bind().dialect.name != 'postgresql':
+        return
+
+    if NOTIFY_CLEAR_ALL in payloads or len(payloads) > NOTIFY_MAX_USERS:
+        payloads = {NOTIFY_CLEAR_ALL}
+
+    connection = session.connection()
+    for payload in payloads:
+        connection.execute(
+            text('SELECT pg_notify(:channel, :payload)'),
+            {'channel': INVALIDATION_CHANNEL, 'payload': payload}
+        )
+
+def _apply_notification(payload):
+    """Drop the cache entries named by a NOTIFY payload"""
+    if payload == NOTIFY_CLEAR_ALL:
+        clear()
+    else:
+        invalidate_user(payload)
+
+def _listen(app, engine):
+    """LISTEN for invalidations from other workers on a dedicated connection, reconnecting with backoff"""
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    retry_delay = LISTEN_RETRY_SECONDS
+    while True:
+        connection = None
+        try:
+            connection = engine.dialect.dbapi.connect(*cargs, **cparams)
+            connection.autocommit = True
+            connection.cursor().execute(f'LISTEN {INVALIDATION_CHANNEL}')
+            retry_delay = LISTEN_RETRY_SECONDS
+
+            # Anything announced while disconnected was missed
+            clear()
+
+            with selectors.DefaultSelector() as selector:
+                selector.register(connection, selectors.EVENT_READ)
+                while True:
+                    if not selector.select(timeout=LISTEN_POLL_SECONDS):
+                        # Quiet interval: a round trip raises if the server or network went away
+                        connection.cursor().execute('SELECT 1')
+                    connection.poll()
+                    while connection.notifies:
+                        _apply_notification(connection.notifies.pop(0).payload)
+        except Exception as e:
+            app.logger.error(f"Permission cache listener failed, reconnecting in {retry_delay}s: {str(e)}")
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        time.sleep(retry_delay)
+        retry_delay = min(retry_delay * 2, LISTEN_RETRY_MAX_SECONDS)
+
+_listener_lock = threading.Lock()
+_listener_thread = None
+
+def _start_listener_thread(app, engine):
+    """Start the listener thread unless this process already has one"""
+    global _listener_thread
+    with _listener_lock:
+        if _listener_thread is None:
+            _listener_thread = threading.Thread(target=_listen, args=(app, engine),
+                                                name='permission-cache-listener', daemon=True)
+            _listener_thread.start()
+
+def start_listener(app):
+    """Start the invalidation listener with the first request this process serves (False if the engine cannot LISTEN)"""
+    # The listener relies on psycopg2's connection.poll()/notifies
+    with app.app_context():
+        engine = db.engine
+    if (engine.dialect.name, engine.dialect.driver) != ('postgresql', 'psycopg2'):
+        return False
+
+    # Deferred to the first request so one-shot CLI runs (flask init-db, shell) never start it
+    @app.before_request
+    def start_permission_cache_listener():
+        if _listener_thread is None:
+            _start_listener_thread(app, engine)
+
+    return True
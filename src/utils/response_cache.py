@@ -0,0 +1,90 @@
+"""
+Response Cache
+Smart Village Management System
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+
+# Serialized 200 responses keyed by (namespace, version, path, query args).
+# Bumping a namespace's version orphans all of its entries without scanning keys;
+# other workers pick the change up when their entries expire
+RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_MAX = 1000
+
+_versions = {}
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def _make_key(namespace):
+    """Cache key for the current request in namespace"""
+    return (
+        namespace,
+        _versions.get(namespace, 0),
+        request.path,
+        tuple(sorted(request.args.items(multi=True)))
+    )
+
+def _get(key):
+    """Cached (body, etag) for key, or None on a miss or expired entry"""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry[0], entry[2]
+
+def _store(key, body, ttl):
+    """Cache a response body for ttl seconds, returning its ETag"""
+    etag = hashlib.md5(body).hexdigest()
+    with _lock:
+        _cache[key] = (body, time.monotonic() + ttl, etag)
+        _cache.move_to_end(key)
+        if len(_cache) > RESPONSE_CACHE_MAX:
+            _cache.popitem(last=False)
+    return etag
+
+def bump(namespace):
+    """Invalidate every cached response in namespace (call after the write commits)"""
+    with _lock:
+        _versions[namespace] = _versions.get(namespace, 0) + 1
+
+def _conditional(response, etag, max_age):
+    """Tag a response with its ETag and client cache lifetime, or turn it into a 304"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'private, max-age={max_age}'
+    return response.make_conditional(request)
+
+def cached_response(namespace, ttl=RESPONSE_CACHE_TTL, max_age=None):
+    """Decorator to serve repeated GETs with identical query args from the response cache
+
+    With max_age set, responses also carry an ETag and Cache-Control so clients
+    can revalidate with If-None-Match and get a bodiless 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = _make_key(namespace)
+            cached = _get(key)
+            if cached is not None:
+                response = Response(cached[0], mimetype='application/json')
+                if max_age is not None:
+                    response = _conditional(response, cached[1], max_age)
+                return response
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                etag = _store(key, response.get_data(), ttl)
+                if max_age is not None:
+                    response = _conditional(response, etag, max_age)
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,12 @@
+"""
+Search Helpers
+Smart Village Management System
+"""
+
+# Escape character of the patterns built by contains_pattern; pass it as ilike(..., escape=LIKE_ESCAPE)
+LIKE_ESCAPE = '\\'
+
+def contains_pattern(term):
+    """'%term%' LIKE pattern with the term's own wildcards (%, _) escaped so they match literally"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
@@ -0,0 +1,19 @@
+-- Database Migration: Clock-free ordering checks on user_villages
+-- assigned_at/activated_at/deactivated_at are stamped by the application in UTC; the old
+-- checks compared them with CURRENT_TIMESTAMP, which follows the session TimeZone
+-- Tables from village_role_migration.sql carry the unnamed user_villages_check/_check1;
+-- tables from db.create_all() carry the named constraints
+
+BEGIN;
+
+ALTER TABLE user_villages DROP CONSTRAINT IF EXISTS user_villages_check;
+ALTER TABLE user_villages DROP CONSTRAINT IF EXISTS user_villages_check1;
+ALTER TABLE user_villages DROP CONSTRAINT IF EXISTS check_assigned_before_activated;
+ALTER TABLE user_villages DROP CONSTRAINT IF EXISTS check_activated_before_deactivated;
+
+ALTER TABLE user_villages ADD CONSTRAINT check_assigned_before_activated
+    CHECK (activated_at IS NULL OR assigned_at <= activated_at);
+ALTER TABLE user_villages ADD CONSTRAINT check_activated_before_deactivated
+    CHECK (deactivated_at IS NULL OR activated_at <= deactivated_at);
+
+COMMIT;
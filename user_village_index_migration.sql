@@ -0,0 +1,18 @@
+-- Database Migration: Partial indexes for active user-village assignment lookups
+-- Existing databases do not pick up model-level indexes from db.create_all()
+-- CONCURRENTLY avoids locking user_villages; run outside a transaction block
+
+-- Active assignments of a user (get_user_villages, check_user_village_access)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_uv_user_active ON user_villages(user_id) WHERE is_active;
+
+-- Active assignments of a village, newest first (get_village_users, village users list)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_uv_village_active ON user_villages(village_id, assigned_at) WHERE is_active;
+
+-- A user's active primary village (get_user_primary_village)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_uv_user_primary ON user_villages(user_id) WHERE is_primary AND is_active;
+
+-- Active assignments made by a user, newest first (get_assignments_by_assigner)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_uv_assigner_active ON user_villages(assigned_by, assigned_at) WHERE is_active;
+
+-- All active assignments, newest first (/api/admin/assignments default listing)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_uv_active_assigned ON user_villages(assigned_at) WHERE is_active;
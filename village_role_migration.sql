@@ -76,8 +76,8 @@ CREATE TABLE IF NOT EXISTS user_villages (
     
     -- Constraints
     UNIQUE(user_id, village_id),
-    CHECK (assigned_at <= COALESCE(activated_at, CURRENT_TIMESTAMP)),
-    CHECK (activated_at <= COALESCE(deactivated_at, CURRENT_TIMESTAMP))
+    CONSTRAINT check_assigned_before_activated CHECK (activated_at IS NULL OR assigned_at <= activated_at),
+    CONSTRAINT check_activated_before_deactivated CHECK (deactivated_at IS NULL OR activated_at <= deactivated_at)
 );
 
 -- Indexes for User-Villages
@@ -0,0 +1,11 @@
+-- Database Migration: Trigram indexes for village search
+-- Lets name/code ILIKE '%term%' (village list search, /api/villages/search) use
+-- index scans combined with BitmapOr instead of a sequential scan
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_villages_name_trgm
+    ON villages USING gin (name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_villages_code_trgm
+    ON villages USING gin (code gin_trgm_ops);